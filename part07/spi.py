@@ -211,10 +211,24 @@ class Parser(object):
 ###############################################################################
 
 class NodeVisitor(object):
+    # node class -> visit_ function, per visitor class
+    visitors = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.visitors = {}
+
     def visit(self, node):
-        method_name = 'visit_' + type(node).__name__
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        visitor = self.visitors.get(type(node))
+        if visitor is None:
+            visitor = self.resolve_visitor(type(node))
+        return visitor(self, node)
+
+    @classmethod
+    def resolve_visitor(cls, node_class):
+        visitor = getattr(cls, 'visit_' + node_class.__name__, cls.generic_visit)
+        cls.visitors[node_class] = visitor
+        return visitor
 
     def generic_visit(self, node):
         raise Exception('No visit_{} method'.format(type(node).__name__))
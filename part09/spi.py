@@ -197,6 +197,8 @@ class Var(AST):
     def __init__(self, token):
         self.token = token
         self.value = token.value
+        # names are case-insensitive; normalize once here, not on every access
+        self.name = token.value.upper()
 
 
 class NoOp(AST):
@@ -400,10 +402,24 @@ class Parser(object):
 ###############################################################################
 
 class NodeVisitor(object):
+    # node class -> visit_ function, per visitor class
+    visitors = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.visitors = {}
+
     def visit(self, node):
-        method_name = 'visit_' + type(node).__name__
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        visitor = self.visitors.get(type(node))
+        if visitor is None:
+            visitor = self.resolve_visitor(type(node))
+        return visitor(self, node)
+
+    @classmethod
+    def resolve_visitor(cls, node_class):
+        visitor = getattr(cls, 'visit_' + node_class.__name__, cls.generic_visit)
+        cls.visitors[node_class] = visitor
+        return visitor
 
     def generic_visit(self, node):
         raise Exception('No visit_{} method'.format(type(node).__name__))
@@ -411,10 +427,10 @@ class NodeVisitor(object):
 
 class Interpreter(NodeVisitor):
 
-    GLOBAL_SCOPE = {}
-
     def __init__(self, parser):
         self.parser = parser
+        # one scope per interpreter, so separate evaluate() calls don't share variables
+        self.GLOBAL_SCOPE = {}
 
     def visit_BinOp(self, node):
         if node.op.type == PLUS:
@@ -441,14 +457,12 @@ class Interpreter(NodeVisitor):
             self.visit(child)
 
     def visit_Assign(self, node):
-        var_name = node.left.value
-        self.GLOBAL_SCOPE[var_name.upper()] = self.visit(node.right)
+        self.GLOBAL_SCOPE[node.left.name] = self.visit(node.right)
 
     def visit_Var(self, node):
-        var_name = node.value
-        val = self.GLOBAL_SCOPE.get(var_name.upper())
+        val = self.GLOBAL_SCOPE.get(node.name)
         if val is None:
-            raise NameError(repr(var_name))
+            raise NameError(repr(node.value))
         else:
             return val
 
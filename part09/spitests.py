@@ -38,6 +38,10 @@ END.
     eval_insensitive = evaluate(insensitive)
     self.assertEqual(eval_insensitive, EXPECTED_GLOBAL_SCOPE)
 
+  def test_separate_scopes(self):
+    self.assertEqual(evaluate('BEGIN y := 1 END.'), {'Y': 1})
+    self.assertEqual(evaluate('BEGIN z := 2 END.'), {'Z': 2})
+
 if __name__ == '__main__':
   unittest.main()
 
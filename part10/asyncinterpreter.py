@@ -0,0 +1,54 @@
+'''
+Runs part10 programs inside an asyncio event loop without blocking it: the
+interpreter hands control back to the loop every steps_per_yield statements,
+so many evaluations can share one loop and a long program cannot starve
+the others.
+'''
+
+import asyncio
+
+from spi import Interpreter, Compound, NoOp, Parser, RegexLexer
+
+
+def statements(compound):
+    # the statements of nested BEGIN ... END blocks in execution order,
+    # walked with an explicit stack so that nesting depth is not limited
+    stack = [iter(compound.children)]
+    while stack:
+        for child in stack[-1]:
+            if isinstance(child, Compound):
+                stack.append(iter(child.children))
+                break
+            if not isinstance(child, NoOp):
+                yield child
+        else:
+            stack.pop()
+
+
+class AsyncInterpreter(Interpreter):
+    def __init__(self, parser, steps_per_yield=1000):
+        Interpreter.__init__(self, parser)
+        self.steps_per_yield = steps_per_yield
+        # statements executed so far
+        self.steps = 0
+
+    async def run(self, program):
+        block = program.block
+        for decl in block.declarations:
+            self.visit(decl)
+        budget = self.steps_per_yield
+        for statement in statements(block.compound_statement):
+            self.visit(statement)
+            self.steps += 1
+            budget -= 1
+            if budget == 0:
+                budget = self.steps_per_yield
+                await asyncio.sleep(0)
+        return self.scope
+
+    async def interpret(self):
+        return await self.run(self.parser.parse())
+
+
+async def evaluate_async(text, steps_per_yield=1000):
+    return await AsyncInterpreter(Parser(RegexLexer(text)), steps_per_yield).interpret()
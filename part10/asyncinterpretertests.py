@@ -0,0 +1,50 @@
+import asyncio
+import unittest
+
+from spi import evaluate, IterativeParser, RegexLexer
+from asyncinterpreter import AsyncInterpreter, evaluate_async
+
+sample_program = open("part10.pas", "r").read()
+
+
+def counting_program(statements):
+    return 'PROGRAM p; VAR i : INTEGER; BEGIN ' + '; '.join(['i := i + 1'] * statements) + ' END.'
+
+
+class TestSuite(unittest.TestCase):
+    def test_program(self):
+        self.assertEqual(asyncio.run(evaluate_async(sample_program)), evaluate(sample_program))
+
+    def test_step_count(self):
+        interpreter = AsyncInterpreter(IterativeParser(RegexLexer(sample_program)))
+        asyncio.run(interpreter.interpret())
+        self.assertEqual(interpreter.steps, 6)
+
+    def test_yields_to_other_tasks(self):
+        finished = []
+
+        async def evaluate_and_record(name, text):
+            scope = await evaluate_async(text, steps_per_yield=10)
+            finished.append(name)
+            return scope
+
+        async def main():
+            return await asyncio.gather(
+                evaluate_and_record('big', counting_program(10000)),
+                evaluate_and_record('small', counting_program(50)))
+
+        big, small = asyncio.run(main())
+        self.assertEqual(big, {'i': 10000})
+        self.assertEqual(small, {'i': 50})
+        # the small program did not wait for the big one to finish
+        self.assertEqual(finished, ['small', 'big'])
+
+    def test_deep_nesting(self):
+        text = 'PROGRAM p; BEGIN ' + 'BEGIN ' * 5000 + 'x := 1' + ' END' * 5000 + '; y := x + 1 END.'
+        interpreter = AsyncInterpreter(IterativeParser(RegexLexer(text)), steps_per_yield=1)
+        self.assertEqual(asyncio.run(interpreter.interpret()), {'x': 1, 'y': 2})
+        self.assertEqual(interpreter.steps, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
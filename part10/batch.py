@@ -0,0 +1,138 @@
+'''
+Evaluates one part10 program over many sets of initial values at once.
+The inputs are columns, one per seeded variable, and every statement runs
+once over whole columns instead of once per row.
+
+With NumPy installed the columns are arrays and the operators are NumPy's
+vectorized ones. Without it they are lists and each operator is mapped over
+them, which still walks the tree only once. NumPy integers are 64 bit, so
+INTEGER results that overflow wrap around instead of growing as they do in
+the Interpreter; division by zero raises FloatingPointError there.
+'''
+
+from spi import NodeVisitor, BINARY_OPERATIONS, UNARY_OPERATIONS, INTEGER, PLUS, parse
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def map_binary(op, left, right):
+    if isinstance(left, list):
+        if isinstance(right, list):
+            return list(map(op, left, right))
+        return [op(value, right) for value in left]
+    if isinstance(right, list):
+        return [op(left, value) for value in right]
+    return op(left, right)
+
+
+def map_unary(op, operand):
+    if isinstance(operand, list):
+        return list(map(op, operand))
+    return op(operand)
+
+
+class BatchInterpreter(NodeVisitor):
+    '''
+    Values in scope are either scalars, shared by every row, or columns.
+    Statements that only involve scalars therefore run once, like in the
+    Interpreter.
+    '''
+
+    def __init__(self, columns, use_numpy=None):
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        if use_numpy and numpy is None:
+            raise ImportError('NumPy is not installed')
+        self.use_numpy = use_numpy
+        self.length = None
+        self.columns = {}
+        for name, column in columns.items():
+            if use_numpy:
+                column = numpy.asarray(column)
+            else:
+                column = list(column)
+            if self.length is None:
+                self.length = len(column)
+            elif len(column) != self.length:
+                raise ValueError('Column ' + name + ' has ' + str(len(column)) + ' rows, expected ' + str(self.length))
+            self.columns[name] = column
+        self.scope = {}
+
+    def visit_Program(self, program):
+        self.visit(program.block)
+
+    def visit_Block(self, block):
+        for decl in block.declarations:
+            self.visit(decl)
+        # seeded columns replace declared initial values
+        self.scope.update(self.columns)
+        if self.use_numpy:
+            with numpy.errstate(divide='raise', invalid='raise'):
+                self.visit(block.compound_statement)
+        else:
+            self.visit(block.compound_statement)
+
+    def visit_VarDecl(self, var_decl):
+        if var_decl.type_node.token.type == INTEGER:
+            self.scope[var_decl.var_node.value] = 0
+        else:
+            self.scope[var_decl.var_node.value] = 0.0
+
+    def visit_ConstDecl(self, const_decl):
+        self.scope[const_decl.var_node.value] = self.visit(const_decl.value)
+
+    def visit_Compound(self, compound):
+        for child in compound.children:
+            self.visit(child)
+
+    def visit_Assign(self, assign):
+        self.scope[assign.left.value] = self.visit(assign.right)
+
+    def visit_NoOp(self, no_op):
+        pass
+
+    def visit_Num(self, num):
+        return num.value
+
+    def visit_Var(self, var):
+        return self.scope[var.value]
+
+    def visit_BinOp(self, bin_op):
+        op = BINARY_OPERATIONS[bin_op.op.type]
+        if self.use_numpy:
+            return op(self.visit(bin_op.left), self.visit(bin_op.right))
+        return map_binary(op, self.visit(bin_op.left), self.visit(bin_op.right))
+
+    def visit_UnaryOp(self, unary_op):
+        if unary_op.op.type == PLUS:
+            return self.visit(unary_op.expr)
+        op = UNARY_OPERATIONS[unary_op.op.type]
+        if self.use_numpy:
+            return op(self.visit(unary_op.expr))
+        return map_unary(op, self.visit(unary_op.expr))
+
+    def column_scope(self):
+        # broadcast the values no column ever reached to full columns
+        length = self.length or 0
+        scope = {}
+        for name, value in self.scope.items():
+            if self.use_numpy:
+                if numpy.ndim(value) == 0:
+                    value = numpy.full(length, value)
+            elif not isinstance(value, list):
+                value = [value] * length
+            scope[name] = value
+        return scope
+
+
+def evaluate_batch(text, columns, use_numpy=None):
+    '''
+    Runs a program once per row of columns, a dict of variable name to
+    initial values, and returns a dict of variable name to final values.
+    '''
+    interpreter = BatchInterpreter(columns, use_numpy)
+    interpreter.visit(parse(text))
+    return interpreter.column_scope()
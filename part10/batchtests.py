@@ -0,0 +1,52 @@
+import unittest
+
+from closurecompiler import evaluate_compiled
+from batch import evaluate_batch, numpy
+
+sample_program = open("part10.pas", "r").read()
+
+
+def rows(text, columns):
+    length = len(next(iter(columns.values())))
+    return [evaluate_compiled(text, dict((name, column[row]) for name, column in columns.items()))
+            for row in range(length)]
+
+
+class TestSuite(unittest.TestCase):
+    def assertMatchesRows(self, text, columns, use_numpy):
+        scope = evaluate_batch(text, columns, use_numpy)
+        for row, expected in enumerate(rows(text, columns)):
+            self.assertEqual(dict((name, scope[name][row]) for name in scope), expected)
+
+    def test_lists(self):
+        columns = {'number': list(range(-50, 50))}
+        self.assertMatchesRows(sample_program, columns, use_numpy=False)
+        scope = evaluate_batch(sample_program, columns, use_numpy=False)
+        self.assertEqual(scope['x'], [11] * 100)
+        self.assertEqual(scope['b'][60], 25)
+
+    def test_seeded_columns_and_scalars(self):
+        program = 'PROGRAM p; VAR r : REAL; BEGIN s := k * 2; r := r / 4 - s; t := -r END.'
+        columns = {'k': [1, 2, 3], 'r': [1.0, 2.0, 10.0]}
+        self.assertMatchesRows(program, columns, use_numpy=False)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            evaluate_batch(sample_program, {'a': [1, 2], 'b': [1]}, use_numpy=False)
+        with self.assertRaises(ZeroDivisionError):
+            evaluate_batch('PROGRAM p; BEGIN x := 1 DIV k END.', {'k': [1, 0]}, use_numpy=False)
+        with self.assertRaises(KeyError):
+            evaluate_batch('PROGRAM p; BEGIN x := y END.', {'k': [1]}, use_numpy=False)
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_numpy(self):
+        columns = {'number': numpy.arange(-50, 50), 'y': numpy.linspace(0.0, 1.0, 100)}
+        self.assertMatchesRows(sample_program, columns, use_numpy=True)
+        scope = evaluate_batch(sample_program, columns)
+        self.assertIsInstance(scope['x'], numpy.ndarray)
+        with self.assertRaises(FloatingPointError):
+            evaluate_batch('PROGRAM p; BEGIN x := 1 DIV k END.', {'k': numpy.array([1, 0])})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+'''
+Compiles a parsed part10 Program into nested Python closures, once, so that
+running it many times skips the tree walk: operators are bound to their
+functions and variables to slots in a list at compile time.
+'''
+
+from operator import itemgetter
+
+from spi import NodeVisitor, Compound, NoOp, BINARY_OPERATIONS, UNARY_OPERATIONS, INTEGER, REAL, parse
+
+# value of a slot that has not been declared or assigned yet
+UNSET = object()
+
+
+class ClosureCompiler(NodeVisitor):
+    def __init__(self):
+        # name -> index into the values list a compiled program runs against
+        self.slots = {}
+        self.initial_values = []
+        self.declared = set()
+
+    def slot(self, name):
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = self.slots[name] = len(self.initial_values)
+            self.initial_values.append(UNSET)
+        return slot
+
+    def visit_Program(self, program):
+        body = self.visit(program.block)
+        slots = self.slots
+        initial_values = self.initial_values
+
+        def run(seed=None):
+            values = list(initial_values)
+            extra = {}
+            if seed:
+                for name, value in seed.items():
+                    if name in slots:
+                        values[slots[name]] = value
+                    else:
+                        extra[name] = value
+            body(values)
+            scope = dict((name, values[slot]) for name, slot in slots.items()
+                         if values[slot] is not UNSET)
+            scope.update(extra)
+            return scope
+
+        return run
+
+    def visit_Block(self, block):
+        for decl in block.declarations:
+            self.visit(decl)
+        return self.visit(block.compound_statement)
+
+    def visit_VarDecl(self, var_decl):
+        name = var_decl.var_node.value
+        self.declared.add(name)
+        if var_decl.type_node.token.type == INTEGER:
+            self.initial_values[self.slot(name)] = 0
+        else:
+            self.initial_values[self.slot(name)] = 0.0
+
+    def visit_ConstDecl(self, const_decl):
+        # constant expressions only read earlier constants, so they can be
+        # evaluated once here against the initial values
+        value = self.visit(const_decl.value)(self.initial_values)
+        name = const_decl.var_node.value
+        self.declared.add(name)
+        self.initial_values[self.slot(name)] = value
+
+    def visit_Compound(self, compound):
+        statements = [self.visit(statement) for statement in self.flatten(compound)]
+
+        def run_compound(values):
+            for statement in statements:
+                statement(values)
+
+        return run_compound
+
+    def flatten(self, compound):
+        # nested BEGIN ... END blocks and empty statements leave no trace at
+        # run time, so the compiled body is one flat list of assignments
+        for child in compound.children:
+            if isinstance(child, Compound):
+                for statement in self.flatten(child):
+                    yield statement
+            elif not isinstance(child, NoOp):
+                yield child
+
+    def visit_Assign(self, assign):
+        expr = self.visit(assign.right)
+        slot = self.slot(assign.left.value)
+        if assign.static_type == REAL and assign.right.static_type == INTEGER:
+            # a type checked INTEGER value widens when stored in a REAL
+            integer_expr = expr
+            expr = lambda values: float(integer_expr(values))
+
+        def run_assign(values):
+            values[slot] = expr(values)
+
+        return run_assign
+
+    def visit_Num(self, num):
+        value = num.value
+        return lambda values: value
+
+    def visit_Var(self, var):
+        name = var.value
+        get = itemgetter(self.slot(name))
+        if name in self.declared:
+            return get
+
+        def run_var(values):
+            value = get(values)
+            if value is UNSET:
+                raise KeyError(name)
+            return value
+
+        return run_var
+
+    def visit_BinOp(self, bin_op):
+        left = self.visit(bin_op.left)
+        right = self.visit(bin_op.right)
+        op = BINARY_OPERATIONS[bin_op.op.type]
+        return lambda values: op(left(values), right(values))
+
+    def visit_UnaryOp(self, unary_op):
+        expr = self.visit(unary_op.expr)
+        op = UNARY_OPERATIONS[unary_op.op.type]
+        return lambda values: op(expr(values))
+
+    def visit_NoOp(self, no_op):
+        return lambda values: None
+
+
+def compile_program(program):
+    return ClosureCompiler().visit(program)
+
+
+def evaluate_compiled(text, seed=None):
+    return compile_program(parse(text))(seed)
@@ -0,0 +1,43 @@
+import unittest
+
+from spi import evaluate, parse
+from closurecompiler import compile_program, evaluate_compiled
+
+sample_program = open("part10.pas", "r").read()
+
+SEEDED_PROGRAM = """
+PROGRAM seeded;
+VAR
+    number, a : INTEGER;
+    y         : REAL;
+BEGIN
+    a := number * 2 - -number DIV 3;
+    y := a / 4
+END.
+"""
+
+
+class TestSuite(unittest.TestCase):
+    def test_program(self):
+        self.assertEqual(evaluate_compiled(sample_program), evaluate(sample_program))
+
+    def test_seeded_runs(self):
+        run = compile_program(parse(SEEDED_PROGRAM))
+        for number in range(-5, 6):
+            expected = evaluate(SEEDED_PROGRAM.replace('BEGIN', 'BEGIN number := ' + str(number) + ';'))
+            self.assertEqual(run({'number': number}), expected)
+        self.assertEqual(run(), {'number': 0, 'a': 0, 'y': 0.0})
+
+    def test_undeclared_variables(self):
+        self.assertEqual(evaluate_compiled('PROGRAM p; BEGIN x := 1; y := x + 1 END.'), {'x': 1, 'y': 2})
+        with self.assertRaises(KeyError):
+            evaluate_compiled('PROGRAM p; BEGIN x := y END.')
+        self.assertEqual(evaluate_compiled('PROGRAM p; BEGIN x := y END.', {'y': 3}), {'x': 3, 'y': 3})
+
+    def test_const_section(self):
+        program = 'PROGRAM p; CONST ten = 10; half = ten / 4; VAR x : INTEGER; BEGIN x := ten * 2 END.'
+        self.assertEqual(evaluate_compiled(program), evaluate(program))
+
+
+if __name__ == '__main__':
+    unittest.main()
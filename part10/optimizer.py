@@ -0,0 +1,213 @@
+'''
+AST optimization passes for part10 programs. Each pass returns a new tree
+and leaves the one it was given untouched; evaluating the result gives the
+same scope as evaluating the original.
+
+Dead-store elimination and the def-use analysis under it live in spi,
+whose evaluate() uses them to run only what wanted variables need.
+'''
+
+from spi import NodeVisitor, Interpreter, Program, Block, ConstDecl, Compound, Assign, BinOp, UnaryOp, \
+    Num, Var, Token, FIXED_TOKENS, BINARY_OPERATIONS, UNARY_OPERATIONS, ID, INTEGER, PLUS, MINUS, \
+    INTEGER_CONST, REAL_CONST, parse, variables, flatten, eliminate_dead_stores
+
+
+def number(value):
+    if isinstance(value, float):
+        return Num(Token(REAL_CONST, value))
+    return Num(Token(INTEGER_CONST, value))
+
+
+class ConstantFolder(NodeVisitor):
+    '''
+    Evaluates every operator whose operands are literals, substitutes CONST
+    declarations into their uses, and rewrites negations that cancel out:
+    `- -e` and `+e` become `e`, `a - -b` becomes `a + b` and `a + -b`
+    becomes `a - b`. Folding uses the same operator functions as the
+    Interpreter, so DIV stays floor division, / stays true division and
+    INTEGER/REAL results keep their Python types.
+    '''
+
+    def __init__(self):
+        # CONST name -> folded value
+        self.constants = {}
+
+    def visit_Program(self, program):
+        return Program(program.name, self.visit(program.block))
+
+    def visit_Block(self, block):
+        declarations = [self.visit(decl) for decl in block.declarations]
+        return Block(declarations, self.visit(block.compound_statement))
+
+    def visit_VarDecl(self, var_decl):
+        return var_decl
+
+    def visit_ConstDecl(self, const_decl):
+        value = self.visit(const_decl.value)
+        if isinstance(value, Num):
+            self.constants[const_decl.var_node.value] = value.value
+        return ConstDecl(const_decl.var_node, value)
+
+    def visit_Compound(self, compound):
+        return Compound([self.visit(child) for child in compound.children])
+
+    def visit_Assign(self, assign):
+        return Assign(assign.left, assign.op, self.visit(assign.right))
+
+    def visit_NoOp(self, no_op):
+        return no_op
+
+    def visit_Num(self, num):
+        return num
+
+    def visit_Var(self, var):
+        if var.value in self.constants:
+            return number(self.constants[var.value])
+        return var
+
+    def visit_BinOp(self, bin_op):
+        left = self.visit(bin_op.left)
+        right = self.visit(bin_op.right)
+        op = bin_op.op
+        if isinstance(left, Num) and isinstance(right, Num):
+            try:
+                return number(BINARY_OPERATIONS[op.type](left.value, right.value))
+            except ArithmeticError:
+                # division by zero, or an int too large to mix with a float:
+                # leave it for run time, where the Interpreter raises it
+                pass
+        if op.type in (PLUS, MINUS) and isinstance(right, UnaryOp) and right.op.type == MINUS:
+            if op.type == PLUS:
+                op = FIXED_TOKENS['-']
+            else:
+                op = FIXED_TOKENS['+']
+            right = right.expr
+        return BinOp(left, op, right)
+
+    def visit_UnaryOp(self, unary_op):
+        expr = self.visit(unary_op.expr)
+        if unary_op.op.type == PLUS:
+            return expr
+        if isinstance(expr, Num):
+            return number(UNARY_OPERATIONS[MINUS](expr.value))
+        if isinstance(expr, UnaryOp) and expr.op.type == MINUS:
+            return expr.expr
+        return UnaryOp(unary_op.op, expr)
+
+
+def fold_constants(program):
+    return ConstantFolder().visit(program)
+
+
+def run(program):
+    interpreter = Interpreter(None)
+    interpreter.visit(program)
+    return interpreter.scope
+
+
+def evaluate_optimized(text):
+    return run(optimize(parse(text)))
+
+
+def expression_key(node):
+    # structural identity of an expression; literals are keyed by type too
+    # because 1 and 1.0 compare (and hash) equal
+    if isinstance(node, Num):
+        return (type(node.value), node.value)
+    if isinstance(node, Var):
+        return node.value
+    if isinstance(node, BinOp):
+        return (node.op.type, expression_key(node.left), expression_key(node.right))
+    return (node.op.type, expression_key(node.expr))
+
+
+class Propagator(object):
+    '''
+    Forward pass over a flat statement list: substitutes variables known to
+    hold a literal or to be a copy of another variable, re-folds, and
+    replaces an expression that some variable still holds by that variable.
+    '''
+
+    def __init__(self):
+        # name -> Num or Var it can be replaced by
+        self.values = {}
+        # expression_key -> (name of a variable currently holding it, names
+        # the expression reads)
+        self.available = {}
+        # reverse indexes, so that an assignment only looks at the facts it
+        # invalidates: name -> names in values that are a copy of it, and
+        # name -> keys in available that it holds or that read it
+        self.copies = {}
+        self.mentions = {}
+        self.folder = ConstantFolder()
+
+    def declare(self, decl):
+        name = decl.var_node.value
+        if isinstance(decl, ConstDecl):
+            value = self.folder.visit(self.substitute(decl.value))
+            if isinstance(value, Num):
+                self.values[name] = value
+        elif decl.type_node.token.type == INTEGER:
+            self.values[name] = number(0)
+        else:
+            self.values[name] = number(0.0)
+
+    def substitute(self, node):
+        if isinstance(node, Var):
+            return self.values.get(node.value, node)
+        if isinstance(node, BinOp):
+            return BinOp(self.substitute(node.left), node.op, self.substitute(node.right))
+        if isinstance(node, UnaryOp):
+            return UnaryOp(node.op, self.substitute(node.expr))
+        return node
+
+    def assign(self, assign):
+        name = assign.left.value
+        right = self.folder.visit(self.substitute(assign.right))
+        if isinstance(right, (BinOp, UnaryOp)):
+            available = self.available.get(expression_key(right))
+            if available is not None:
+                right = Var(Token(ID, available[0]))
+        self.kill(name)
+        if isinstance(right, Num):
+            self.values[name] = right
+        elif isinstance(right, Var) and right.value != name:
+            self.values[name] = right
+            self.copies.setdefault(right.value, set()).add(name)
+        elif isinstance(right, (BinOp, UnaryOp)):
+            names = variables(right)
+            if name not in names:
+                key = expression_key(right)
+                self.available[key] = (name, names)
+                for other in names | {name}:
+                    self.mentions.setdefault(other, set()).add(key)
+        return Assign(assign.left, assign.op, right)
+
+    def kill(self, name):
+        # forget every fact that mentions the variable about to change
+        value = self.values.pop(name, None)
+        if isinstance(value, Var):
+            self.copies[value.value].discard(name)
+        for other in self.copies.pop(name, ()):
+            del self.values[other]
+        for key in self.mentions.pop(name, ()):
+            holder, names = self.available.pop(key)
+            for other in names | {holder}:
+                if other != name:
+                    self.mentions[other].discard(key)
+
+
+def propagate(program):
+    propagator = Propagator()
+    for decl in program.block.declarations:
+        propagator.declare(decl)
+    statements = [propagator.assign(statement) for statement in flatten(program.block.compound_statement)]
+    return Program(program.name, Block(program.block.declarations, Compound(statements)))
+
+
+def optimize(program, outputs=None):
+    '''
+    Constant folding, then copy/constant propagation with common
+    subexpression reuse, then dead-store elimination.
+    '''
+    return eliminate_dead_stores(propagate(fold_constants(program)), outputs)
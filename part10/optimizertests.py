@@ -0,0 +1,175 @@
+import unittest
+
+from spi import evaluate, parse, BinOp, Num, Var, Token, INTEGER_CONST, REAL_CONST, ID, PLUS, MINUS
+from optimizer import fold_constants, optimize, propagate, eliminate_dead_stores, run, evaluate_optimized, \
+    flatten, Propagator
+
+sample_program = open("part10.pas", "r").read()
+
+CONST_PROGRAM = """
+PROGRAM consts;
+CONST
+    ten = 10;
+    half = ten / 4;
+    quarter = ten DIV 4;
+    negative = -ten;
+VAR
+    a : INTEGER;
+    y : REAL;
+BEGIN
+    a := ten * 2 + quarter;
+    y := half * a - - negative;
+    z := a + - - + - 3
+END.
+"""
+
+
+def statements(program):
+    return fold_constants(parse(program)).block.compound_statement.children
+
+
+class TestSuite(unittest.TestCase):
+    def test_program(self):
+        self.assertEqual(evaluate_optimized(sample_program), evaluate(sample_program))
+        y = statements(sample_program)[2]
+        self.assertEqual(y.right, Num(Token(REAL_CONST, 20 / 7 + 3.14)))
+
+    def test_division_and_types(self):
+        folded = statements('PROGRAM p; BEGIN a := 7 DIV 2; b := 7 / 2; c := 4 / 2; d := 2.0 * 3; e := 7.5 DIV 2 END.')
+        self.assertEqual([statement.right.token for statement in folded], [
+            Token(INTEGER_CONST, 3),
+            Token(REAL_CONST, 3.5),
+            Token(REAL_CONST, 2.0),
+            Token(REAL_CONST, 6.0),
+            Token(REAL_CONST, 3.0)
+        ])
+        self.assertIsInstance(folded[2].right.value, float)
+
+    def test_const_section(self):
+        folded = statements(CONST_PROGRAM)
+        self.assertEqual(folded[0].right, Num(Token(INTEGER_CONST, 22)))
+        self.assertEqual(folded[1].right.op, Token(MINUS, '-'))
+        self.assertEqual(folded[1].right.right, Num(Token(INTEGER_CONST, 10)))
+        self.assertEqual(evaluate_optimized(CONST_PROGRAM), evaluate(CONST_PROGRAM))
+        self.assertEqual(evaluate(CONST_PROGRAM)['half'], 2.5)
+
+    def test_double_negation(self):
+        a, b = Var(Token(ID, 'a')), Var(Token(ID, 'b'))
+        folded = statements('PROGRAM p; VAR a, b : INTEGER; BEGIN c := a - - b; d := a + - b; e := - - a; f := + a END.')
+        self.assertEqual(folded[0].right, BinOp(a, Token(PLUS, '+'), b))
+        self.assertEqual(folded[1].right, BinOp(a, Token(MINUS, '-'), b))
+        self.assertEqual(folded[2].right, a)
+        self.assertEqual(folded[3].right, a)
+
+    def test_division_by_zero_is_not_folded(self):
+        program = 'PROGRAM p; BEGIN x := 1 DIV 0 END.'
+        self.assertIsInstance(statements(program)[0].right, BinOp)
+        with self.assertRaises(ZeroDivisionError):
+            evaluate_optimized(program)
+
+    def test_constant_redeclared(self):
+        for program in ('PROGRAM p; CONST x = 1; VAR x : INTEGER; BEGIN y := x END.',
+                        'PROGRAM p; CONST x = 1; VAR a, x : INTEGER; BEGIN y := x END.',
+                        'PROGRAM p; CONST x = 1; x = 2; BEGIN y := x END.'):
+            with self.assertRaises(Exception) as context:
+                evaluate_optimized(program)
+            self.assertEqual(str(context.exception), 'Error parsing: duplicate declaration of constant x')
+
+    def test_input_tree_untouched(self):
+        tree = parse(sample_program)
+        fold_constants(tree)
+        self.assertEqual(tree, parse(sample_program))
+
+    def test_dead_stores(self):
+        program = 'PROGRAM p; VAR a : INTEGER; BEGIN a := b; a := 2; BEGIN x := 1; x := x + 1 END; a := 3 END.'
+        optimized = eliminate_dead_stores(parse(program))
+        # `a := b` stays because b is unbound and reading it raises
+        self.assertEqual([str(statement.right) for statement in optimized.block.compound_statement.children][0],
+                         str(Var(Token(ID, 'b'))))
+        self.assertEqual(len(optimized.block.compound_statement.children), 4)
+        with self.assertRaises(KeyError):
+            run(optimized)
+        program = program.replace('a := b;', '')
+        optimized = eliminate_dead_stores(parse(program))
+        self.assertEqual(len(optimized.block.compound_statement.children), 3)
+        self.assertEqual(run(optimized), evaluate(program))
+
+    def test_outputs(self):
+        program = 'PROGRAM p; BEGIN a := 2; b := a * 3; c := b + 1; d := 4 END.'
+        optimized = eliminate_dead_stores(parse(program), outputs=['c'])
+        self.assertEqual([statement.left.value for statement in optimized.block.compound_statement.children],
+                         ['a', 'b', 'c'])
+        self.assertEqual(run(optimize(parse(program), outputs=['c'])), {'c': 7})
+
+    def test_propagation(self):
+        program = """
+        PROGRAM p;
+        BEGIN
+            a := m * n + k;
+            b := a;
+            c := b - 1;
+            d := m * n + k;
+            m := 3;
+            e := m * n + k
+        END.
+        """
+        folded = propagate(parse(program)).block.compound_statement.children
+        a = Var(Token(ID, 'a'))
+        # copy propagation: c reads a, not b
+        self.assertEqual(folded[2].right, BinOp(a, Token(MINUS, '-'), Num(Token(INTEGER_CONST, 1))))
+        # common subexpression: d reuses a, e must not once m changed
+        self.assertEqual(folded[3].right, a)
+        self.assertIsInstance(folded[5].right, BinOp)
+        # declared variables start as literals and fold through
+        self.assertEqual(propagate(parse('PROGRAM p; VAR n : INTEGER; y : REAL; BEGIN a := n + 1; b := y END.'))
+                         .block.compound_statement.children[1].right, Num(Token(REAL_CONST, 0.0)))
+
+    def test_reassignment_forgets_facts(self):
+        program = 'PROGRAM p; BEGIN m := 1; a := m; b := a; c := a + m; a := 5; d := b; e := a + m; ' \
+            'm := 2; f := b + m; g := a + m; b := 7; h := d END.'
+        self.assertEqual(run(propagate(parse(program))), evaluate(program))
+        propagator = Propagator()
+        for statement in flatten(parse('PROGRAM p; BEGIN b := a; c := a + b; a := 1 END.').block.compound_statement):
+            propagator.assign(statement)
+        # a changed, so no fact about it or its copy b is left anywhere
+        self.assertEqual((propagator.values, propagator.available), ({'a': Num(Token(INTEGER_CONST, 1))}, {}))
+        self.assertEqual([names for names in propagator.mentions.values() if names], [])
+
+    def test_overflow(self):
+        squares = 'PROGRAM p; BEGIN x := 3; ' + '; '.join(['x := x * x'] * 12)
+        # folding leaves the int too large for a float alone
+        program = squares + '; y := x * 1.5 END.'
+        self.assertIsInstance(propagate(parse(program)).block.compound_statement.children[-1].right, BinOp)
+        with self.assertRaises(OverflowError):
+            run(optimize(parse(program)))
+        # unneeded stores that might overflow are kept
+        for tail in ('y := x / 2; z := 1', 'y := x + 0.5; z := 1', 'y := x DIV 2.0; z := 1'):
+            program = squares + '; ' + tail + ' END.'
+            with self.assertRaises(OverflowError):
+                evaluate(program)
+            with self.assertRaises(OverflowError):
+                run(optimize(parse(program), outputs=['z']))
+        # same-type arithmetic cannot raise, so it can go
+        program = 'PROGRAM p; VAR r : REAL; BEGIN x := 3; y := x * x; s := r * 2.5; z := 1 END.'
+        self.assertEqual(len(eliminate_dead_stores(parse(program), outputs=['z']).block.compound_statement.children), 1)
+
+    def test_optimize_matches_interpreter(self):
+        programs = [sample_program, CONST_PROGRAM, """
+        PROGRAM p;
+        VAR i, j : INTEGER; r : REAL;
+        BEGIN
+            i := 5; j := i; i := 7; r := j / 2;
+            BEGIN j := j * i; j := j * i END;
+            x := i * j - r; y := i * j - r; i := 1.5; z := i + 0.5; n := 1; n := 1.0
+        END.
+        """]
+        for program in programs:
+            optimized = optimize(parse(program))
+            self.assertEqual(run(optimized), evaluate(program))
+            self.assertEqual([type(value) for value in run(optimized).values()],
+                             [type(value) for value in evaluate(program).values()])
+        self.assertLess(len(optimize(parse(programs[2])).block.compound_statement.children), 13)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+'''
+An on-disk cache of parsed programs, in the spirit of __pycache__: the hash
+of a program's source names a file holding its ASTArena, so a warm run
+skips the lexer and the parser and evaluates straight from the arena.
+
+An arena is flat, so it serializes as a few raw arrays plus its constants
+pool, with marshal; deep trees need no recursion to save or load. The
+format version and the interpreter's cache tag are part of the hash, so
+bumping CACHE_VERSION (or switching Python versions) simply stops old
+files from being found, and eviction removes them in time.
+
+Writes go to a temporary file that is renamed into place, so concurrent
+processes only ever see complete files. The directory is kept under
+max_bytes by evicting the least recently used files, with the modification
+time doubling as the last use time; see DirectoryBudget for how often that
+is checked.
+'''
+
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+import time
+
+from spi import ASTArena, ArenaInterpreter, parse_arena
+
+CACHE_VERSION = 1
+
+SUFFIX = '.arena'
+TEMPORARY_SUFFIX = '.tmp'
+
+# temporary files older than this, in seconds, belong to no live writer
+STALE_TEMPORARY = 3600
+# eviction stops at this fraction of max_bytes
+LOW_WATER = 0.9
+# fewest stores between two scans of the directory
+MIN_SCAN_INTERVAL = 64
+
+
+def dump_arena(arena):
+    return marshal.dumps((arena.kinds.tobytes(), arena.a.tobytes(), arena.b.tobytes(), arena.c.tobytes(),
+                          arena.children.tobytes(), arena.constants, arena.root))
+
+
+def load_arena(data):
+    kinds, a, b, c, children, constants, root = marshal.loads(data)
+    arena = ASTArena()
+    arena.kinds.frombytes(kinds)
+    arena.a.frombytes(a)
+    arena.b.frombytes(b)
+    arena.c.frombytes(c)
+    arena.children.frombytes(children)
+    arena.constants = constants
+    arena.constant_indices = dict(((type(value), value), index) for index, value in enumerate(constants))
+    arena.root = root
+    return arena
+
+
+def remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def write_atomically(directory, path, data):
+    # readers in other processes see either no file or all of it
+    descriptor, temporary = tempfile.mkstemp(suffix=TEMPORARY_SUFFIX, dir=directory)
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        remove(temporary)
+        raise
+
+
+class DirectoryBudget(object):
+    '''
+    Keeps a cache directory under max_bytes by evicting the least recently
+    modified files. Listing the directory on every store would make filling
+    a cache quadratic, so the bytes stored are added to the total of the
+    last scan instead, and the directory is only scanned again once that
+    total crosses max_bytes or enough stores have gone by that other
+    processes may have filled it too. Eviction goes down to LOW_WATER of
+    max_bytes so that a full cache is not rescanned on every store.
+    '''
+
+    def __init__(self, directory, suffix, max_bytes):
+        self.directory = directory
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        # bytes in the directory as of the last scan plus those stored
+        # since, None before the first scan
+        self.total = None
+        self.stores = 0
+        self.interval = MIN_SCAN_INTERVAL
+        self.scans = 0
+        self.evictions = 0
+
+    def stored(self, size):
+        '''Accounts for a file just written; returns the files evicted.'''
+        self.stores += 1
+        if self.total is not None:
+            self.total += size
+            if self.total <= self.max_bytes and self.stores < self.interval:
+                return 0
+        return self.scan()
+
+    def scan(self):
+        files = []
+        total = 0
+        evicted = 0
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            stray = entry.name.endswith(TEMPORARY_SUFFIX)
+            if not stray and not entry.name.endswith(self.suffix):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if stray and now - stat.st_mtime > STALE_TEMPORARY:
+                # left behind by a writer that died
+                remove(entry.path)
+                evicted += 1
+                continue
+            total += stat.st_size
+            if not stray:
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        if total > self.max_bytes:
+            target = self.max_bytes * LOW_WATER
+            files.sort()
+            for mtime, size, path in files:
+                if total <= target:
+                    break
+                remove(path)
+                total -= size
+                evicted += 1
+        self.total = total
+        self.stores = 0
+        self.interval = max(MIN_SCAN_INTERVAL, len(files) // 2)
+        self.scans += 1
+        self.evictions += evicted
+        return evicted
+
+
+class ParseCache(object):
+    def __init__(self, directory, max_bytes=64 << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.tag = 'spi-' + str(CACHE_VERSION) + '-' + str(sys.implementation.cache_tag) + '\n'
+        self.hits = 0
+        self.misses = 0
+        self.budget = DirectoryBudget(directory, SUFFIX, max_bytes)
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, text):
+        digest = hashlib.sha256((self.tag + text).encode('utf-8', 'surrogatepass')).hexdigest()
+        return os.path.join(self.directory, digest + SUFFIX)
+
+    def load(self, path):
+        try:
+            with open(path, 'rb') as file:
+                arena = load_arena(file.read())
+            # mark it as recently used for eviction
+            os.utime(path)
+            return arena
+        except FileNotFoundError:
+            # never stored, or evicted by another process meanwhile
+            return None
+        except (ValueError, EOFError, TypeError):
+            # unreadable, e.g. written by a marshal format we don't read
+            remove(path)
+            return None
+
+    def store(self, path, arena):
+        data = dump_arena(arena)
+        write_atomically(self.directory, path, data)
+        self.budget.stored(len(data))
+
+    def parse(self, text):
+        '''The program's ASTArena, from the cache if possible.'''
+        path = self.path(text)
+        arena = self.load(path)
+        if arena is not None:
+            self.hits += 1
+            return arena
+        self.misses += 1
+        arena = parse_arena(text)
+        self.store(path, arena)
+        return arena
+
+
+def evaluate_cached(text, cache):
+    interpreter = ArenaInterpreter(cache.parse(text))
+    interpreter.interpret()
+    return interpreter.scope
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+
+import parsecache
+from spi import evaluate, parse, parse_arena
+from parsecache import ParseCache, evaluate_cached, dump_arena, load_arena
+
+sample_program = open("part10.pas", "r").read()
+
+
+def program(i):
+    return 'PROGRAM p; VAR x : INTEGER; BEGIN x := ' + ' + '.join([str(i)] * 50) + ' END.'
+
+
+class TestSuite(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def files(self):
+        return sorted(name for name in os.listdir(self.directory.name))
+
+    def test_round_trip(self):
+        arena = load_arena(dump_arena(parse_arena(sample_program)))
+        self.assertEqual(arena.to_ast(), parse(sample_program))
+        deep = 'PROGRAM p; BEGIN x := ' + '(' * 5000 + '1' + ')' * 5000 + ' END.'
+        self.assertEqual(len(load_arena(dump_arena(parse_arena(deep, iterative=True)))), 6)
+
+    def test_warm_run_skips_parser(self):
+        cache = ParseCache(self.directory.name)
+        self.assertEqual(evaluate_cached(sample_program, cache), evaluate(sample_program))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        original = parsecache.parse_arena
+        parsecache.parse_arena = None
+        try:
+            self.assertEqual(evaluate_cached(sample_program, ParseCache(self.directory.name)), evaluate(sample_program))
+        finally:
+            parsecache.parse_arena = original
+        self.assertEqual(len(self.files()), 1)
+        self.assertTrue(self.files()[0].endswith('.arena'))
+
+    def test_versioned(self):
+        cache = ParseCache(self.directory.name)
+        cache.parse(sample_program)
+        original = parsecache.CACHE_VERSION
+        parsecache.CACHE_VERSION = original + 1
+        try:
+            newer = ParseCache(self.directory.name)
+            newer.parse(sample_program)
+            self.assertEqual((newer.hits, newer.misses), (0, 1))
+        finally:
+            parsecache.CACHE_VERSION = original
+        self.assertEqual(len(self.files()), 2)
+
+    def test_corrupt_file_is_a_miss(self):
+        cache = ParseCache(self.directory.name)
+        with open(cache.path(sample_program), 'wb') as file:
+            file.write(b'not marshal data')
+        self.assertEqual(evaluate_cached(sample_program, cache), evaluate(sample_program))
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(evaluate_cached(sample_program, cache), evaluate(sample_program))
+        self.assertEqual(cache.hits, 1)
+
+    def test_lru_eviction(self):
+        size = len(dump_arena(parse_arena(program(0))))
+        # eviction goes down to 90% of the budget, so one file at a time
+        cache = ParseCache(self.directory.name, max_bytes=size * 7 // 2)
+        paths = [cache.path(program(i)) for i in range(5)]
+        for i in range(3):
+            cache.parse(program(i))
+            os.utime(paths[i], (i, i))
+        # using 0 makes 1 the least recently used
+        cache.parse(program(0))
+        cache.parse(program(3))
+        self.assertEqual([os.path.exists(path) for path in paths[:4]], [True, False, True, True])
+        cache.parse(program(4))
+        self.assertEqual([os.path.exists(path) for path in paths], [True, False, False, True, True])
+        self.assertFalse([name for name in self.files() if name.endswith('.tmp')])
+        self.assertEqual(cache.budget.evictions, 2)
+
+    def test_scans_are_amortized(self):
+        cache = ParseCache(self.directory.name)
+        for i in range(300):
+            cache.parse(program(i))
+        self.assertEqual(len(self.files()), 300)
+        # not one per store: after 64 stores, then after half the files again
+        self.assertLessEqual(cache.budget.scans, 6)
+        size = len(dump_arena(parse_arena(program(0))))
+        cache = ParseCache(self.directory.name, max_bytes=size * 100)
+        cache.parse(program(300))
+        self.assertEqual(len(self.files()), 90)
+        self.assertEqual(cache.budget.total, size * 90)
+
+    def test_stray_temporary_files(self):
+        stale = os.path.join(self.directory.name, 'stale.tmp')
+        fresh = os.path.join(self.directory.name, 'fresh.tmp')
+        for path in stale, fresh:
+            with open(path, 'wb') as file:
+                file.write(b'x' * 1000)
+        os.utime(stale, (0, 0))
+        cache = ParseCache(self.directory.name)
+        cache.parse(sample_program)
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(fresh))
+        # a live writer's file still counts towards the budget
+        self.assertEqual(cache.budget.total, 1000 + os.path.getsize(cache.path(sample_program)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+'''
+The part07 postfix translator, taken further: instead of printing the RPN
+of an expression, PostfixCompiler emits it as bytecode for a whole part10
+program, and VM runs that bytecode on an operand stack.
+
+Instruction i is ops[i] with argument args[i], kept in two parallel
+arrays. The argument indexes the constant pool for LOAD_CONST and the
+variable slots for the LOAD and STORE family, and is unused otherwise.
+Programs have no jumps, so the VM walks the instructions with a plain for
+loop instead of maintaining a program counter.
+'''
+
+from array import array
+
+from spi import NodeVisitor, INTEGER, PLUS, MINUS, MUL, INTEGER_DIV, FLOAT_DIV, parse
+
+LOAD_CONST, LOAD, LOAD_CHECKED, STORE, NEGATE, ADD, SUBTRACT, MULTIPLY, INTEGER_DIVIDE, FLOAT_DIVIDE = range(10)
+
+OPCODE_NAMES = ('LOAD_CONST', 'LOAD', 'LOAD_CHECKED', 'STORE', 'NEGATE',
+                'ADD', 'SUBTRACT', 'MULTIPLY', 'INTEGER_DIVIDE', 'FLOAT_DIVIDE')
+
+BINARY_OPCODES = {
+    PLUS: ADD,
+    MINUS: SUBTRACT,
+    MUL: MULTIPLY,
+    INTEGER_DIV: INTEGER_DIVIDE,
+    FLOAT_DIV: FLOAT_DIVIDE
+}
+
+# value of a slot that has not been declared or assigned yet
+UNSET = object()
+
+
+class Bytecode(object):
+    def __init__(self, ops, args, constants, names, initial_values):
+        self.ops = ops
+        self.args = args
+        self.constants = constants
+        # slot -> variable name
+        self.names = names
+        self.initial_values = initial_values
+
+    def disassemble(self):
+        lines = []
+        for op, arg in zip(self.ops, self.args):
+            if op == LOAD_CONST:
+                lines.append(OPCODE_NAMES[op] + ' ' + repr(self.constants[arg]))
+            elif op in (LOAD, LOAD_CHECKED, STORE):
+                lines.append(OPCODE_NAMES[op] + ' ' + self.names[arg])
+            else:
+                lines.append(OPCODE_NAMES[op])
+        return '\n'.join(lines)
+
+
+class PostfixCompiler(NodeVisitor):
+    def __init__(self):
+        self.ops = array('B')
+        self.args = array('i')
+        self.constants = []
+        # (type, value) -> constant index, so 1 and 1.0 stay apart
+        self.constant_indices = {}
+        self.slots = {}
+        self.initial_values = []
+        self.declared = set()
+
+    def emit(self, op, arg=0):
+        self.ops.append(op)
+        self.args.append(arg)
+
+    def slot(self, name):
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = self.slots[name] = len(self.initial_values)
+            self.initial_values.append(UNSET)
+        return slot
+
+    def visit_Program(self, program):
+        self.visit(program.block)
+        return Bytecode(self.ops, self.args, self.constants, list(self.slots), self.initial_values)
+
+    def visit_Block(self, block):
+        for decl in block.declarations:
+            self.visit(decl)
+        self.visit(block.compound_statement)
+
+    def visit_VarDecl(self, var_decl):
+        name = var_decl.var_node.value
+        if var_decl.type_node.token.type == INTEGER:
+            value = 0
+        else:
+            value = 0.0
+        if name in self.slots:
+            # read by a CONST above, which must find it unset, or declared
+            # twice: either way it gets its value when the code gets here
+            self.emit(LOAD_CONST, self.constant(value))
+            self.emit(STORE, self.slots[name])
+        else:
+            self.initial_values[self.slot(name)] = value
+        self.declared.add(name)
+
+    def visit_ConstDecl(self, const_decl):
+        self.visit(const_decl.value)
+        name = const_decl.var_node.value
+        self.declared.add(name)
+        self.emit(STORE, self.slot(name))
+
+    def visit_Compound(self, compound):
+        for child in compound.children:
+            self.visit(child)
+
+    def visit_NoOp(self, no_op):
+        pass
+
+    def visit_Assign(self, assign):
+        self.visit(assign.right)
+        self.emit(STORE, self.slot(assign.left.value))
+
+    def constant(self, value):
+        key = (type(value), value)
+        index = self.constant_indices.get(key)
+        if index is None:
+            index = self.constant_indices[key] = len(self.constants)
+            self.constants.append(value)
+        return index
+
+    def visit_Num(self, num):
+        self.emit(LOAD_CONST, self.constant(num.value))
+
+    def visit_Var(self, var):
+        if var.value in self.declared:
+            self.emit(LOAD, self.slot(var.value))
+        else:
+            self.emit(LOAD_CHECKED, self.slot(var.value))
+
+    def visit_BinOp(self, bin_op):
+        self.visit(bin_op.left)
+        self.visit(bin_op.right)
+        self.emit(BINARY_OPCODES[bin_op.op.type])
+
+    def visit_UnaryOp(self, unary_op):
+        self.visit(unary_op.expr)
+        if unary_op.op.type == MINUS:
+            self.emit(NEGATE)
+
+
+class VM(object):
+    def run(self, bytecode):
+        constants = bytecode.constants
+        values = list(bytecode.initial_values)
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        for op, arg in zip(bytecode.ops, bytecode.args):
+            if op == LOAD:
+                push(values[arg])
+            elif op == LOAD_CONST:
+                push(constants[arg])
+            elif op == STORE:
+                values[arg] = pop()
+            elif op == ADD:
+                right = pop()
+                stack[-1] += right
+            elif op == MULTIPLY:
+                right = pop()
+                stack[-1] *= right
+            elif op == SUBTRACT:
+                right = pop()
+                stack[-1] -= right
+            elif op == NEGATE:
+                stack[-1] = -stack[-1]
+            elif op == INTEGER_DIVIDE:
+                right = pop()
+                stack[-1] //= right
+            elif op == FLOAT_DIVIDE:
+                right = pop()
+                stack[-1] /= right
+            else:
+                value = values[arg]
+                if value is UNSET:
+                    raise KeyError(bytecode.names[arg])
+                push(value)
+        return dict((name, value) for name, value in zip(bytecode.names, values) if value is not UNSET)
+
+
+def compile_program(program):
+    return PostfixCompiler().visit(program)
+
+
+def evaluate_bytecode(text):
+    return VM().run(compile_program(parse(text)))
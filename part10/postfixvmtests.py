@@ -0,0 +1,55 @@
+import unittest
+
+from spi import evaluate, parse
+from postfixvm import compile_program, evaluate_bytecode, VM
+
+sample_program = open("part10.pas", "r").read()
+
+
+class TestSuite(unittest.TestCase):
+    def test_disassemble(self):
+        bytecode = compile_program(parse('PROGRAM p; VAR a : INTEGER; BEGIN a := (5 + 3) * -a / 2.0 END.'))
+        expected = '\n'.join([
+            'LOAD_CONST 5',
+            'LOAD_CONST 3',
+            'ADD',
+            'LOAD a',
+            'NEGATE',
+            'MULTIPLY',
+            'LOAD_CONST 2.0',
+            'FLOAT_DIVIDE',
+            'STORE a'
+        ])
+        self.assertEqual(bytecode.disassemble(), expected)
+
+    def test_program(self):
+        self.assertEqual(evaluate_bytecode(sample_program), evaluate(sample_program))
+
+    def test_constant_pool(self):
+        bytecode = compile_program(parse('PROGRAM p; BEGIN a := 1 + 1.0 + 1; b := 1 END.'))
+        self.assertEqual(bytecode.constants, [1, 1.0])
+        self.assertIsInstance(bytecode.constants[1], float)
+
+    def test_rerun(self):
+        bytecode = compile_program(parse(sample_program))
+        vm = VM()
+        self.assertEqual(vm.run(bytecode), vm.run(bytecode))
+
+    def test_undeclared_variables(self):
+        self.assertEqual(evaluate_bytecode('PROGRAM p; BEGIN x := 1; y := x DIV 2 END.'), {'x': 1, 'y': 0})
+        with self.assertRaises(KeyError):
+            evaluate_bytecode('PROGRAM p; BEGIN x := y END.')
+
+    def test_const_section(self):
+        program = 'PROGRAM p; CONST ten = 10; half = ten / 4; VAR x : INTEGER; BEGIN x := ten * 2 END.'
+        self.assertEqual(evaluate_bytecode(program), evaluate(program))
+        # x is not declared yet when k is evaluated
+        with self.assertRaises(KeyError):
+            evaluate_bytecode('PROGRAM p; CONST k = x + 1; VAR x : INTEGER; BEGIN END.')
+        program = 'PROGRAM p; VAR x : INTEGER; x : REAL; BEGIN y := x END.'
+        self.assertEqual(evaluate_bytecode(program), evaluate(program))
+        self.assertIsInstance(evaluate_bytecode(program)['y'], float)
+
+
+if __name__ == '__main__':
+    unittest.main()
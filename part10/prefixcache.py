@@ -0,0 +1,149 @@
+'''
+Reuses the work of programs that start the same way. Programs have no
+control flow, so the scope at any `;` of the main block depends on nothing
+but the source text before it. PrefixCache snapshots the scope at every
+`interval`-th such `;`, keyed by a hash of the text up to it (leaving out
+the PROGRAM header, so the program's name does not matter), and a later
+program with the same text up to a snapshot resumes there: the prefix is
+hashed, but neither lexed, parsed nor executed again. Only the header is,
+as it is short and whether it is valid must not depend on what is cached.
+
+To be able to resume in the middle of nested BEGIN ... END blocks, the
+statements are parsed and executed one at a time rather than parsed into
+a tree first. As a consequence, a program with a syntax error executes
+the statements before the error before raising it.
+'''
+
+import hashlib
+import re
+from collections import OrderedDict
+
+from spi import Interpreter, Parser, RegexLexer, PROGRAM, ID, SEMI, BEGIN, END, DOT, EOF
+
+# statement separators, the main block's BEGIN, and comments to skip over
+BOUNDARY = re.compile(r'\{[^}]*\}|;|\bBEGIN\b', re.IGNORECASE)
+
+
+def semicolons(text):
+    '''
+    The offset just past the PROGRAM header and the offsets of the `;`s
+    that follow the main block's BEGIN.
+    '''
+    header_end = None
+    begin_seen = False
+    offsets = []
+    for match in BOUNDARY.finditer(text):
+        lexeme = match.group()
+        if lexeme == ';':
+            if header_end is None:
+                header_end = match.end()
+            elif begin_seen:
+                offsets.append(match.start())
+        elif lexeme[0] != '{':
+            begin_seen = True
+    return header_end, offsets
+
+
+class Snapshot(object):
+    __slots__ = ('scope', 'depth', 'constants')
+
+    def __init__(self, scope, depth, constants):
+        self.scope = scope
+        # BEGIN blocks open at the `;`
+        self.depth = depth
+        # the Parser's CONST names, so the rest still can't assign them
+        self.constants = constants
+
+
+class PrefixCache(object):
+    def __init__(self, max_snapshots=256, interval=64):
+        self.max_snapshots = max_snapshots
+        self.interval = interval
+        # prefix digest -> Snapshot, least recently used first
+        self.snapshots = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def remember(self, digest, snapshot):
+        self.snapshots[digest] = snapshot
+        if len(self.snapshots) > self.max_snapshots:
+            self.snapshots.popitem(last=False)
+            self.evictions += 1
+
+    def digests(self, text):
+        # digests[k] identifies the text up to checkpoint k, which is the
+        # ((k + 1) * interval)-th `;` of the main block, and offsets[k] is
+        # where that `;` is
+        header_end, offsets = semicolons(text)
+        offsets = offsets[self.interval - 1::self.interval]
+        digests = []
+        prefix = hashlib.sha256()
+        start = header_end
+        for offset in offsets:
+            prefix.update(text[start:offset + 1].encode('utf-8', 'surrogatepass'))
+            digests.append(prefix.digest())
+            start = offset + 1
+        return header_end, digests, offsets
+
+    def evaluate(self, text):
+        '''The scope evaluate(text) returns.'''
+        header_end, digests, offsets = self.digests(text)
+        interpreter = Interpreter(None)
+        for checkpoint in range(len(digests) - 1, -1, -1):
+            snapshot = self.snapshots.get(digests[checkpoint])
+            if snapshot is not None:
+                self.snapshots.move_to_end(digests[checkpoint])
+                self.hits += 1
+                # the header is not part of the digest, but must still parse
+                header = Parser(RegexLexer(text[:header_end]))
+                header.eat(PROGRAM)
+                header.eat(ID)
+                header.eat(SEMI)
+                header.eat(EOF)
+                parser = Parser(RegexLexer(text[offsets[checkpoint] + 1:]))
+                parser.constants = set(snapshot.constants)
+                interpreter.scope = dict(snapshot.scope)
+                count = (checkpoint + 1) * self.interval
+                depth = snapshot.depth
+                break
+        else:
+            self.misses += 1
+            parser = Parser(RegexLexer(text))
+            parser.eat(PROGRAM)
+            parser.eat(ID)
+            parser.eat(SEMI)
+            for decl in parser.declarations():
+                interpreter.visit(decl)
+            parser.eat(BEGIN)
+            count = 0
+            depth = 1
+
+        # at the start of a statement inside `depth` BEGIN blocks
+        while True:
+            while parser.current_token.type == BEGIN:
+                parser.eat(BEGIN)
+                depth += 1
+            if parser.current_token.type == ID:
+                interpreter.visit(parser.assignment_statement())
+            # after a statement, close as many blocks as end here
+            while parser.current_token.type != SEMI:
+                parser.eat(END)
+                depth -= 1
+                if depth == 0:
+                    break
+            if depth == 0:
+                break
+            parser.eat(SEMI)
+            count += 1
+            if count % self.interval == 0:
+                digest = digests[count // self.interval - 1]
+                if digest not in self.snapshots:
+                    self.remember(digest, Snapshot(dict(interpreter.scope), depth, frozenset(parser.constants)))
+        parser.eat(DOT)
+        if parser.current_token.type is not EOF:
+            parser.error('Parsed program, but next token is not EOF. Found: ' + str(parser.current_token))
+        return interpreter.scope
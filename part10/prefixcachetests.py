@@ -0,0 +1,80 @@
+import unittest
+
+from spi import evaluate
+from prefixcache import PrefixCache
+
+sample_program = open("part10.pas", "r").read()
+
+PREAMBLE = """
+PROGRAM {name};
+CONST k = 3;
+VAR i, j : INTEGER;
+BEGIN
+    i := k;
+    BEGIN
+        j := i * 2; { ; BEGIN in a comment }
+        BEGIN i := i + j; j := j - 1 END;
+        i := i * k
+    END;
+    j := j + i;
+"""
+
+
+def program(name, tail):
+    return PREAMBLE.replace('{name}', name) + tail + '\nEND.'
+
+
+class TestSuite(unittest.TestCase):
+    def test_sample_program(self):
+        cache = PrefixCache(interval=1)
+        for i in range(2):
+            self.assertEqual(cache.evaluate(sample_program), evaluate(sample_program))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_resume(self):
+        tails = ['x := i + j', 'BEGIN x := i - j; BEGIN y := x END END', 'x := 1.5;', '']
+        for interval in (1, 2, 3):
+            cache = PrefixCache(interval=interval)
+            for index, tail in enumerate(tails):
+                text = program('p' + str(index), tail)
+                self.assertEqual(cache.evaluate(text), evaluate(text))
+            self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+    def test_different_prefix(self):
+        cache = PrefixCache(interval=1)
+        cache.evaluate(program('p', 'x := 1'))
+        other = program('p', 'x := 1').replace('i := k;', 'i := k + 1;')
+        self.assertEqual(cache.evaluate(other), evaluate(other))
+        self.assertEqual(cache.misses, 2)
+
+    def test_errors_after_resume(self):
+        cache = PrefixCache(interval=1)
+        cache.evaluate(program('p', 'x := 1'))
+        with self.assertRaises(Exception) as context:
+            cache.evaluate(program('p', 'k := 1'))
+        self.assertEqual(str(context.exception), 'Error parsing: cannot assign to constant k')
+        for tail in ('x := 1 END', 'BEGIN x := 1', 'x := 1 END. y'):
+            with self.assertRaises(Exception):
+                cache.evaluate(program('p', tail))
+        with self.assertRaises(ZeroDivisionError):
+            cache.evaluate(program('p', 'x := i DIV 0'))
+        # a resumed program still needs a valid header
+        for header in ('this is not pascal at all 123 @@@;', 'PROGRAM p q;', 'PROGRAM;'):
+            text = program('p', 'x := 1').replace('PROGRAM p;', header)
+            with self.assertRaises(Exception) as context:
+                evaluate(text)
+            with self.assertRaises(Exception) as cached:
+                cache.evaluate(text)
+            self.assertEqual(str(cached.exception), str(context.exception))
+
+    def test_eviction(self):
+        cache = PrefixCache(max_snapshots=3, interval=1)
+        cache.evaluate(program('p', 'x := 1'))
+        self.assertEqual((len(cache), cache.evictions), (3, 3))
+        # the snapshots kept are the latest, so the next run resumes there
+        self.assertEqual(cache.evaluate(program('p', 'x := 2')), evaluate(program('p', 'x := 2')))
+        self.assertEqual(cache.hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
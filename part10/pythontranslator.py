@@ -0,0 +1,146 @@
+'''
+Translates a part10 Program into the source of a Python function and
+compiles it, so that CPython's own bytecode interpreter runs the Pascal
+statements. Each variable becomes a local of that function, `DIV` becomes
+`//` and `/` stays true division.
+
+CPython's compiler rejects expressions nested more than about 200
+parentheses deep, or too deep for its recursion limit, which the other
+backends run fine. Such programs are handed to the closure compiler.
+'''
+
+from functools import lru_cache
+
+import closurecompiler
+from spi import NodeVisitor, BinOp, INTEGER, PLUS, MINUS, MUL, INTEGER_DIV, FLOAT_DIV, parse
+
+# token type -> (Python operator, precedence). Pascal and Python agree on
+# precedence and left associativity here, so parentheses are only needed
+# where the tree disagrees with the default grouping.
+PYTHON_OPERATORS = {
+    PLUS: ('+', 1),
+    MINUS: ('-', 1),
+    MUL: ('*', 2),
+    INTEGER_DIV: ('//', 2),
+    FLOAT_DIV: ('/', 2)
+}
+
+UNARY_PRECEDENCE = 3
+
+
+def unbound(name):
+    raise KeyError(name)
+
+
+class Translator(NodeVisitor):
+    def __init__(self):
+        # Pascal name -> Python local. Locals are numbered rather than named
+        # after the variable so no identifier can clash with a Python keyword.
+        self.locals = {}
+        self.bound = set()
+
+    def local(self, name):
+        local = self.locals.get(name)
+        if local is None:
+            local = self.locals[name] = 'v' + str(len(self.locals))
+        return local
+
+    def visit_Program(self, program):
+        lines = ['def program():']
+        lines.extend('    ' + line for line in self.visit(program.block))
+        lines.append('    return {' + ', '.join(
+            repr(name) + ': ' + local for name, local in self.locals.items()) + '}')
+        return '\n'.join(lines) + '\n'
+
+    def visit_Block(self, block):
+        lines = []
+        for decl in block.declarations:
+            lines.append(self.visit(decl))
+        lines.extend(self.visit(block.compound_statement))
+        return lines
+
+    def visit_VarDecl(self, var_decl):
+        if var_decl.type_node.token.type == INTEGER:
+            return self.store(var_decl.var_node.value, '0')
+        return self.store(var_decl.var_node.value, '0.0')
+
+    def visit_ConstDecl(self, const_decl):
+        return self.store(const_decl.var_node.value, self.visit(const_decl.value))
+
+    def visit_Compound(self, compound):
+        lines = []
+        for child in compound.children:
+            line = self.visit(child)
+            if isinstance(line, list):
+                lines.extend(line)
+            elif line is not None:
+                lines.append(line)
+        return lines
+
+    def visit_Assign(self, assign):
+        return self.store(assign.left.value, self.visit(assign.right))
+
+    def store(self, name, value):
+        self.bound.add(name)
+        return self.local(name) + ' = ' + value
+
+    def visit_NoOp(self, no_op):
+        return None
+
+    def visit_Num(self, num):
+        value = repr(num.value)
+        if value in ('inf', '-inf', 'nan'):
+            return "float('" + value + "')"
+        return value
+
+    def visit_Var(self, var):
+        if var.value not in self.bound:
+            # the Interpreter raises KeyError here, so the translation does too
+            return 'unbound(' + repr(var.value) + ')'
+        return self.local(var.value)
+
+    def visit_BinOp(self, bin_op):
+        op, precedence = PYTHON_OPERATORS[bin_op.op.type]
+        left = self.operand(bin_op.left, precedence)
+        right = self.operand(bin_op.right, precedence + 1)
+        return left + ' ' + op + ' ' + right
+
+    def visit_UnaryOp(self, unary_op):
+        if unary_op.op.type == PLUS:
+            op = '+'
+        else:
+            op = '-'
+        return op + self.operand(unary_op.expr, UNARY_PRECEDENCE)
+
+    def operand(self, node, min_precedence):
+        source = self.visit(node)
+        if isinstance(node, BinOp) and PYTHON_OPERATORS[node.op.type][1] < min_precedence:
+            return '(' + source + ')'
+        return source
+
+
+def translate_program(program):
+    return Translator().visit(program)
+
+
+def translate(text):
+    return translate_program(parse(text))
+
+
+def compile_program(program, filename='<pascal>'):
+    try:
+        code = compile(translate_program(program), filename, 'exec')
+    except (SyntaxError, RecursionError):
+        return closurecompiler.compile_program(program)
+    namespace = {'unbound': unbound}
+    exec(code, namespace)
+    return namespace['program']
+
+
+@lru_cache(maxsize=256)
+def load(text):
+    return compile_program(parse(text))
+
+
+def evaluate_python(text):
+    return load(text)()
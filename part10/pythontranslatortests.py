@@ -0,0 +1,55 @@
+import unittest
+
+from spi import evaluate
+from pythontranslator import translate, evaluate_python, load
+
+sample_program = open("part10.pas", "r").read()
+
+
+class TestSuite(unittest.TestCase):
+    def test_translate(self):
+        program = 'PROGRAM p; VAR x : INTEGER; y : REAL; BEGIN x := (1 - (2 - 3)) * 4; y := - - x DIV 2 / (3 * 4) END.'
+        expected = (
+            'def program():\n'
+            '    v0 = 0\n'
+            '    v1 = 0.0\n'
+            '    v0 = (1 - (2 - 3)) * 4\n'
+            '    v1 = --v0 // 2 / (3 * 4)\n'
+            "    return {'x': v0, 'y': v1}\n"
+        )
+        self.assertEqual(translate(program), expected)
+
+    def test_program(self):
+        self.assertEqual(evaluate_python(sample_program), evaluate(sample_program))
+
+    def test_division_semantics(self):
+        program = 'PROGRAM p; VAR a : INTEGER; BEGIN a := -7; q := a DIV 2; r := a / 2; s := 7.5 DIV 2 END.'
+        self.assertEqual(evaluate_python(program), evaluate(program))
+        self.assertEqual(evaluate_python(program)['q'], -4)
+        self.assertIsInstance(evaluate_python(program)['s'], float)
+
+    def test_keyword_names(self):
+        program = 'PROGRAM p; VAR if, None : INTEGER; BEGIN if := 1; None := if + 1 END.'
+        self.assertEqual(evaluate_python(program), {'if': 1, 'None': 2})
+
+    def test_unbound_variable(self):
+        with self.assertRaises(KeyError):
+            evaluate_python('PROGRAM p; BEGIN x := y END.')
+
+    def test_deep_nesting(self):
+        # too many nested parentheses for CPython's parser
+        program = 'PROGRAM p; BEGIN x := ' + '1 - (' * 250 + '1' + ')' * 250 + ' END.'
+        with self.assertRaises(SyntaxError):
+            compile(translate(program), '<pascal>', 'exec')
+        self.assertEqual(evaluate_python(program), evaluate(program))
+
+    def test_load_is_cached(self):
+        self.assertIs(load(sample_program), load(sample_program))
+
+    def test_const_section(self):
+        program = 'PROGRAM p; CONST ten = 10; half = ten / 4; VAR x : INTEGER; BEGIN x := ten * 2 END.'
+        self.assertEqual(evaluate_python(program), evaluate(program))
+
+
+if __name__ == '__main__':
+    unittest.main()
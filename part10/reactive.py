@@ -0,0 +1,138 @@
+'''
+Spreadsheet-style re-evaluation of part10 programs. ReactiveProgram keeps
+the value every assignment produced and, for every variable it reads, the
+assignment whose value it read. When the program text changes it
+recomputes only the assignments whose expression changed and, transitively,
+those that read a value that actually changed.
+
+Statements are matched by position, so an edit that keeps the number of
+assignments and their targets is incremental; adding, removing or
+retargeting an assignment, or touching the declarations, re-runs the whole
+program.
+'''
+
+import heapq
+
+from spi import Interpreter, parse
+from optimizer import flatten, variables
+
+# reaching definition of a variable no assignment has set yet
+DECLARED = -1
+
+
+def same(old, value):
+    # == says 0.0 and -0.0 are equal and nan is not equal to itself, but
+    # 1 / x tells the zeros apart; floats compare by repr instead
+    if type(old) is not type(value):
+        return False
+    if type(value) is float:
+        return repr(old) == repr(value)
+    return old == value
+
+
+class ReactiveProgram(object):
+    def __init__(self, text):
+        # statements re-evaluated by the last run or update
+        self.recomputed = 0
+        self.load(parse(text))
+
+    def load(self, program):
+        self.declarations = program.block.declarations
+        self.statements = flatten(program.block.compound_statement)
+        interpreter = Interpreter(None)
+        for decl in self.declarations:
+            interpreter.visit(decl)
+        self.initial = interpreter.scope
+        # reads[i]: name -> index of the statement whose value statement i reads
+        self.reads = []
+        # dependents[i]: statements that read the value statement i stores
+        self.dependents = [[] for statement in self.statements]
+        last = {}
+        for index, statement in enumerate(self.statements):
+            reads = {}
+            for name in variables(statement.right):
+                definition = last.get(name, DECLARED)
+                reads[name] = definition
+                if definition != DECLARED:
+                    self.dependents[definition].append(index)
+            self.reads.append(reads)
+            last[statement.left.value] = index
+        self.last = last
+        self.values = [None] * len(self.statements)
+        self.valid = False
+        for index in range(len(self.statements)):
+            self.compute(index)
+        self.recomputed = len(self.statements)
+        self.valid = True
+
+    def compute(self, index):
+        interpreter = Interpreter(None)
+        scope = interpreter.scope
+        values = self.values
+        for name, definition in self.reads[index].items():
+            if definition != DECLARED:
+                scope[name] = values[definition]
+            elif name in self.initial:
+                scope[name] = self.initial[name]
+        value = interpreter.visit(self.statements[index].right)
+        old = values[index]
+        values[index] = value
+        return not same(old, value)
+
+    @property
+    def scope(self):
+        scope = dict(self.initial)
+        for name, index in self.last.items():
+            scope[name] = self.values[index]
+        return scope
+
+    def update(self, text):
+        '''Brings the program up to date with text and returns its scope.'''
+        program = parse(text)
+        statements = flatten(program.block.compound_statement)
+        if (not self.valid or program.block.declarations != self.declarations or
+                len(statements) != len(self.statements) or
+                any(new.left != old.left for new, old in zip(statements, self.statements))):
+            self.load(program)
+            return self.scope
+        pending = []
+        for index, (new, old) in enumerate(zip(statements, self.statements)):
+            if new.right != old.right:
+                self.change(index, new)
+                pending.append(index)
+        self.propagate(pending)
+        return self.scope
+
+    def change(self, index, statement):
+        for definition in set(self.reads[index].values()):
+            if definition != DECLARED:
+                self.dependents[definition].remove(index)
+        reads = {}
+        for name in variables(statement.right):
+            definition = DECLARED
+            for earlier in range(index - 1, -1, -1):
+                if self.statements[earlier].left.value == name:
+                    definition = earlier
+                    break
+            reads[name] = definition
+            if definition != DECLARED:
+                self.dependents[definition].append(index)
+        self.reads[index] = reads
+        self.statements[index] = statement
+
+    def propagate(self, pending):
+        # dependents always come later in the program, so taking the lowest
+        # index first computes each statement once, after all its inputs
+        heapq.heapify(pending)
+        queued = set(pending)
+        self.recomputed = 0
+        self.valid = False
+        while pending:
+            index = heapq.heappop(pending)
+            self.recomputed += 1
+            if self.compute(index):
+                for dependent in self.dependents[index]:
+                    if dependent not in queued:
+                        queued.add(dependent)
+                        heapq.heappush(pending, dependent)
+        self.valid = True
@@ -0,0 +1,76 @@
+import math
+import unittest
+
+from spi import evaluate
+from reactive import ReactiveProgram
+
+sample_program = open("part10.pas", "r").read()
+
+
+def chain(first, length=100):
+    # x0 := first; unrelated y's in between; each x reads the previous one
+    statements = ['x0 := ' + first]
+    for i in range(1, length):
+        statements.append('y' + str(i) + ' := ' + str(i) + ' * 2')
+        statements.append('x' + str(i) + ' := x' + str(i - 1) + ' + 1')
+    return 'PROGRAM p; BEGIN ' + '; '.join(statements) + ' END.'
+
+
+class TestSuite(unittest.TestCase):
+    def test_program(self):
+        program = ReactiveProgram(sample_program)
+        self.assertEqual(program.scope, evaluate(sample_program))
+        edited = sample_program.replace('number := 2', 'number := 3')
+        self.assertEqual(program.update(edited), evaluate(edited))
+        # number, a, b and c; not x or y
+        self.assertEqual(program.recomputed, 4)
+
+    def test_only_affected_statements(self):
+        program = ReactiveProgram(chain('1'))
+        self.assertEqual(program.recomputed, 199)
+        self.assertEqual(program.update(chain('5')), evaluate(chain('5')))
+        self.assertEqual(program.recomputed, 100)
+        # the value does not change, so nothing downstream is recomputed
+        self.assertEqual(program.update(chain('2 + 3')), evaluate(chain('5')))
+        self.assertEqual(program.recomputed, 1)
+
+    def test_reassigned_variables(self):
+        text = 'PROGRAM p; VAR a : INTEGER; BEGIN a := 1; b := a; a := 10; c := a; d := e END.'
+        with self.assertRaises(KeyError):
+            ReactiveProgram(text)
+        text = text.replace('d := e', 'd := b + c')
+        program = ReactiveProgram(text)
+        self.assertEqual(program.scope, evaluate(text))
+        for edited in [text.replace('a := 1;', 'a := 2;'), text.replace('c := a', 'c := a + b'),
+                       text.replace('b := a', 'b := a * 1.0')]:
+            self.assertEqual(program.update(edited), evaluate(edited))
+        self.assertIsInstance(program.scope['d'], float)
+
+    def test_signed_zero(self):
+        text = 'PROGRAM p; BEGIN a := 0.0; b := a * 1.0; c := 1 END.'
+        program = ReactiveProgram(text)
+        edited = text.replace('a := 0.0', 'a := -0.0')
+        scope = program.update(edited)
+        self.assertEqual(scope, evaluate(edited))
+        self.assertEqual(math.copysign(1.0, scope['b']), -1.0)
+        self.assertEqual(program.recomputed, 2)
+
+    def test_structural_changes(self):
+        program = ReactiveProgram(sample_program)
+        for edited in [sample_program.replace('x := 11;', 'x := 11; z := x;'),
+                       sample_program.replace('y          : REAL;', 'y, z : REAL;'),
+                       sample_program.replace('x := 11', 'z := 11')]:
+            self.assertEqual(program.update(edited), evaluate(edited))
+            self.assertEqual(program.recomputed, 6 + edited.count('z := x'))
+
+    def test_errors(self):
+        program = ReactiveProgram(chain('1'))
+        with self.assertRaises(ZeroDivisionError):
+            program.update(chain('1 DIV 0'))
+        # a failed update leaves nothing half-computed behind
+        self.assertEqual(program.update(chain('4')), evaluate(chain('4')))
+        self.assertEqual(program.recomputed, 199)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+'''
+An opt-in cache of evaluation results. A part10 program has no inputs, so
+its source determines its scope; the cache key is a hash of the program's
+token stream, which makes programs that differ only in whitespace,
+comments, keyword case or the spelling of a number share an entry.
+
+Identifiers are compared exactly, not case-folded: the Interpreter keys
+its scope by the spelling used in the program, so `x := 1` and `X := 1`
+give different results and must not share an entry.
+
+Results live in a bounded in-memory LRU and, if a directory is given, in a
+disk tier shared between processes, which uses the parse cache's atomic
+writes and eviction. Like the parse cache, the key includes a format
+version and the interpreter's cache tag, since marshal's format and the
+evaluation semantics can change between versions.
+'''
+
+import hashlib
+import marshal
+import os
+import sys
+from collections import OrderedDict
+
+from spi import scan, evaluate, ID, INTEGER_CONST, REAL_CONST
+from parsecache import remove, write_atomically, DirectoryBudget
+
+# bump when evaluate() or the stored format changes, so that entries on
+# disk from before stop being found
+RESULT_CACHE_VERSION = 1
+
+SUFFIX = '.scope'
+
+
+def normalize(text):
+    '''The program's tokens, one per line, with no formatting left.'''
+    parts = []
+    for token in scan(text):
+        if token.type == ID:
+            parts.append('$' + token.value)
+        elif token.type in (INTEGER_CONST, REAL_CONST):
+            # repr keeps 1 and 1.0 apart but makes 1.0 and 1.00 the same
+            parts.append('#' + repr(token.value))
+        else:
+            parts.append(token.type)
+    return '\n'.join(parts)
+
+
+def source_key(text):
+    tag = 'spi-result-' + str(RESULT_CACHE_VERSION) + '-' + str(sys.implementation.cache_tag) + '\n'
+    return hashlib.sha256((tag + normalize(text)).encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+class ResultCache(object):
+    def __init__(self, max_entries=1024, directory=None, max_bytes=64 << 20):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # key -> scope, least recently used first
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        # entries dropped from memory, and files removed from the disk tier
+        self.evictions = 0
+        self.disk_evictions = 0
+        if directory is not None:
+            self.budget = DirectoryBudget(directory, SUFFIX, max_bytes)
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def remember(self, key, scope):
+        self.entries[key] = scope
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def load(self, key):
+        path = os.path.join(self.directory, key + SUFFIX)
+        try:
+            with open(path, 'rb') as file:
+                scope = marshal.loads(file.read())
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (ValueError, EOFError, TypeError):
+            remove(path)
+            return None
+        if not isinstance(scope, dict):
+            remove(path)
+            return None
+        return scope
+
+    def store(self, key, scope):
+        data = marshal.dumps(scope)
+        write_atomically(self.directory, os.path.join(self.directory, key + SUFFIX), data)
+        self.disk_evictions += self.budget.stored(len(data))
+
+    def evaluate(self, text):
+        '''
+        The scope evaluate(text) returns, as a new dict each time. Programs
+        that raise are not cached.
+        '''
+        key = source_key(text)
+        scope = self.entries.get(key)
+        if scope is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return dict(scope)
+        if self.directory is not None:
+            scope = self.load(key)
+            if scope is not None:
+                self.disk_hits += 1
+                self.remember(key, scope)
+                return dict(scope)
+        self.misses += 1
+        scope = evaluate(text)
+        self.remember(key, dict(scope))
+        if self.directory is not None:
+            self.store(key, scope)
+        return scope
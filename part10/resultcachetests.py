@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+import resultcache
+from spi import evaluate
+from resultcache import ResultCache, source_key
+
+sample_program = open("part10.pas", "r").read()
+
+
+class TestSuite(unittest.TestCase):
+    def test_normalized_key(self):
+        reformatted = 'program Part10; var number : integer; a, b, c, x : integer; y : real;' \
+            'begin begin number := 2; a := number; b := 10 * a + 10 * number div 4; c := a - - b end;' \
+            'x := 11; y := 20 / 7 + 3.140; end.'
+        self.assertEqual(source_key(reformatted), source_key(sample_program))
+        self.assertNotEqual(source_key('PROGRAM p; BEGIN x := 1 END.'), source_key('PROGRAM p; BEGIN X := 1 END.'))
+        self.assertNotEqual(source_key('PROGRAM p; BEGIN x := 1 END.'), source_key('PROGRAM p; BEGIN x := 1.0 END.'))
+        self.assertNotEqual(source_key('PROGRAM p; BEGIN x := a END.'), source_key('PROGRAM p; BEGIN x := ab END.'))
+
+    def test_memory_tier(self):
+        cache = ResultCache(max_entries=2)
+        scope = cache.evaluate(sample_program)
+        self.assertEqual(scope, evaluate(sample_program))
+        scope['a'] = 'changed'
+        self.assertEqual(cache.evaluate('{ same program }' + sample_program.replace('BEGIN', 'begin')), evaluate(sample_program))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.evaluate('PROGRAM p; BEGIN x := 1 END.')
+        cache.evaluate('PROGRAM p; BEGIN x := 2 END.')
+        self.assertEqual((len(cache), cache.evictions), (2, 1))
+        cache.evaluate(sample_program)
+        self.assertEqual(cache.misses, 4)
+
+    def test_errors_not_cached(self):
+        cache = ResultCache()
+        for i in range(2):
+            with self.assertRaises(ZeroDivisionError):
+                cache.evaluate('PROGRAM p; BEGIN x := 1 DIV 0 END.')
+        self.assertEqual((len(cache), cache.misses), (0, 2))
+
+    def test_disk_tier(self):
+        with tempfile.TemporaryDirectory() as directory:
+            ResultCache(directory=directory).evaluate(sample_program)
+            cache = ResultCache(directory=directory)
+            original = resultcache.evaluate
+            resultcache.evaluate = None
+            try:
+                self.assertEqual(cache.evaluate(sample_program), evaluate(sample_program))
+            finally:
+                resultcache.evaluate = original
+            self.assertEqual((cache.hits, cache.disk_hits, cache.misses), (0, 1, 0))
+            cache.evaluate(sample_program)
+            self.assertEqual(cache.hits, 1)
+            self.assertEqual(len(os.listdir(directory)), 1)
+            original = resultcache.RESULT_CACHE_VERSION
+            resultcache.RESULT_CACHE_VERSION = original + 1
+            try:
+                newer = ResultCache(directory=directory)
+                newer.evaluate(sample_program)
+                self.assertEqual((newer.disk_hits, newer.misses), (0, 1))
+            finally:
+                resultcache.RESULT_CACHE_VERSION = original
+
+    def test_disk_evictions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(max_entries=1, directory=directory, max_bytes=1)
+            cache.evaluate('PROGRAM p; BEGIN x := 1 END.')
+            cache.evaluate('PROGRAM p; BEGIN x := 2 END.')
+            self.assertEqual((cache.evictions, cache.disk_evictions), (1, 2))
+            self.assertEqual(os.listdir(directory), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
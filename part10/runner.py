@@ -0,0 +1,157 @@
+'''
+Evaluates many part10 programs in a pool of worker processes.
+
+Programs are given as paths or as source text. A path is sent to the
+worker as is and the worker streams the file itself, so large sources are
+never pickled. Programs go out in chunks to keep the per-task overhead of
+the pool low, and only a bounded number of chunks is in flight at a time,
+so results stream back while the input is still being read.
+
+A worker that dies, say killed for running out of memory, breaks the whole
+pool and every chunk in flight with it. Those chunks are run again one
+program per process, so that only the program that kills its process
+fails, and the rest of the input goes to a fresh pool.
+
+Usage: python3 runner.py [-j WORKERS] FILE...
+'''
+
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from spi import evaluate, evaluate_file
+
+
+class Result(object):
+    __slots__ = ('index', 'source', 'scope', 'error')
+
+    def __init__(self, index, source, scope, error):
+        self.index = index
+        # the path, or '<text N>' for a program given as text
+        self.source = source
+        self.scope = scope
+        self.error = error
+
+    def __repr__(self):
+        if self.error is not None:
+            return 'Result(' + self.source + ', error=' + repr(self.error) + ')'
+        return 'Result(' + self.source + ', ' + str(self.scope) + ')'
+
+
+def evaluate_chunk(chunk):
+    results = []
+    for path, source in chunk:
+        try:
+            if path:
+                results.append((evaluate_file(source), None))
+            else:
+                results.append((evaluate(source), None))
+        except Exception as error:
+            results.append((None, error))
+    return results
+
+
+def isolate(chunk):
+    # a pool of its own for every program, so a crash is that program's
+    results = []
+    for item in chunk:
+        with ProcessPoolExecutor(1) as executor:
+            try:
+                results.extend(executor.submit(evaluate_chunk, [item]).result())
+            except BrokenProcessPool as error:
+                results.append((None, error))
+    return results
+
+
+def chunks(paths_or_texts, chunk_size, paths):
+    chunk = []
+    labels = []
+    for index, item in enumerate(paths_or_texts):
+        if paths or isinstance(item, os.PathLike):
+            chunk.append((True, os.fspath(item)))
+            labels.append(os.fspath(item))
+        else:
+            chunk.append((False, item))
+            labels.append('<text ' + str(index) + '>')
+        if len(chunk) == chunk_size:
+            yield index - len(chunk) + 1, labels, chunk
+            chunk = []
+            labels = []
+    if chunk:
+        yield index - len(chunk) + 1, labels, chunk
+
+
+def results(start, labels, chunk, future):
+    try:
+        outcomes = future.result()
+    except BrokenProcessPool:
+        outcomes = isolate(chunk)
+    for offset, (scope, error) in enumerate(outcomes):
+        yield Result(start + offset, labels[offset], scope, error)
+
+
+def evaluate_many(paths_or_texts, workers=None, chunk_size=16, ordered=True, paths=False):
+    '''
+    Generates a Result per program. With ordered=True they come in input
+    order, otherwise as soon as their chunk completes. A program that fails
+    yields a Result with the exception in error instead of stopping the run.
+    Items that are os.PathLike are paths; str items are source text unless
+    paths=True, which makes every item a path.
+    '''
+    if workers is None:
+        workers = os.cpu_count() or 1
+    max_pending = workers * 4
+    pending = deque()
+    executor = ProcessPoolExecutor(workers)
+    try:
+        for start, labels, chunk in chunks(paths_or_texts, chunk_size, paths):
+            try:
+                future = executor.submit(evaluate_chunk, chunk)
+            except BrokenProcessPool:
+                executor.shutdown()
+                executor = ProcessPoolExecutor(workers)
+                future = executor.submit(evaluate_chunk, chunk)
+            pending.append((start, labels, chunk, future))
+            while len(pending) >= max_pending:
+                for result in drain(pending, ordered):
+                    yield result
+        while pending:
+            for result in drain(pending, ordered):
+                yield result
+    finally:
+        executor.shutdown()
+
+
+def drain(pending, ordered):
+    # hand back the results of one finished chunk
+    if ordered:
+        return results(*pending.popleft())
+    wait([entry[3] for entry in pending], return_when=FIRST_COMPLETED)
+    for entry in pending:
+        if entry[3].done():
+            pending.remove(entry)
+            return results(*entry)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate part10 programs in parallel.')
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('-j', '--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=16)
+    args = parser.parse_args()
+    failed = 0
+    for result in evaluate_many(args.files, args.workers, args.chunk_size, paths=True):
+        if result.error is None:
+            print(result.source + ': ' + str(result.scope))
+        else:
+            failed += 1
+            print(result.source + ': error: ' + repr(result.error))
+        sys.stdout.flush()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+import multiprocessing
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import runner
+from spi import evaluate
+from runner import evaluate_many
+
+sample_program = open("part10.pas", "r").read()
+
+
+def crashing_evaluate(text):
+    # stands in for a program that gets its worker killed
+    if 'crash' in text:
+        os._exit(1)
+    return evaluate(text)
+
+
+class TestSuite(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.broken = os.path.join(self.directory.name, 'broken.pas')
+        with open(self.broken, 'w') as file:
+            file.write('PROGRAM broken; BEGIN x := 1 DIV 0 END.')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_input_order(self):
+        texts = ['PROGRAM p; BEGIN x := ' + str(i) + ' * 2 END.' for i in range(50)]
+        inputs = [pathlib.Path('part10.pas')] + texts + [pathlib.Path(self.broken), 'PROGRAM p; BEGIN x := END.']
+        results = list(evaluate_many(inputs, workers=2, chunk_size=4))
+        self.assertEqual([result.index for result in results], list(range(len(inputs))))
+        self.assertEqual(results[0].source, 'part10.pas')
+        self.assertEqual(results[0].scope, evaluate(sample_program))
+        self.assertEqual([result.scope for result in results[1:51]], [{'x': i * 2} for i in range(50)])
+        self.assertEqual(results[1].source, '<text 1>')
+        self.assertIsInstance(results[51].error, ZeroDivisionError)
+        self.assertIsNone(results[51].scope)
+        self.assertIn('Error parsing', str(results[52].error))
+
+    def test_unordered(self):
+        texts = ['PROGRAM p; BEGIN x := ' + str(i) + ' END.' for i in range(40)]
+        results = list(evaluate_many(iter(texts), workers=2, chunk_size=3, ordered=False))
+        self.assertEqual(sorted(result.index for result in results), list(range(40)))
+        for result in results:
+            self.assertEqual(result.scope, {'x': result.index})
+
+    def test_paths(self):
+        results = list(evaluate_many(['part10.pas', 'nosuchfile.pas'], workers=1, paths=True))
+        self.assertEqual(results[0].scope, evaluate(sample_program))
+        self.assertIsInstance(results[1].error, FileNotFoundError)
+        # without paths=True a str is always source text
+        self.assertEqual(list(evaluate_many(['part10.pas'], workers=1))[0].source, '<text 0>')
+
+    @unittest.skipUnless(multiprocessing.get_start_method() == 'fork', 'workers must inherit the patched evaluate')
+    def test_worker_crash(self):
+        texts = ['PROGRAM p; BEGIN x := ' + str(i) + ' END.' for i in range(40)]
+        texts[13] = 'PROGRAM crash; BEGIN END.'
+        runner.evaluate = crashing_evaluate
+        try:
+            for ordered in (True, False):
+                results = sorted(evaluate_many(texts, workers=2, chunk_size=4, ordered=ordered),
+                                 key=lambda result: result.index)
+                self.assertEqual(len(results), 40)
+                self.assertIn('BrokenProcessPool', repr(results[13].error))
+                for result in results[:13] + results[14:]:
+                    self.assertEqual(result.scope, {'x': result.index})
+        finally:
+            runner.evaluate = evaluate
+
+    def test_cli(self):
+        process = subprocess.run([sys.executable, 'runner.py', '-j', '2', 'part10.pas', self.broken, 'nosuchfile.pas'],
+                                 stdout=subprocess.PIPE, universal_newlines=True)
+        self.assertEqual(process.returncode, 1)
+        lines = process.stdout.splitlines()
+        self.assertEqual(lines[0], 'part10.pas: ' + str(evaluate(sample_program)))
+        self.assertTrue(lines[1].startswith(self.broken + ': error: ZeroDivisionError'))
+        self.assertTrue(lines[2].startswith('nosuchfile.pas: error: FileNotFoundError'))
+
+
+if __name__ == '__main__':
+    unittest.main()
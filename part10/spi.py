@@ -3,8 +3,16 @@ If you haven't done so yet, then, as an exercise, re-implement the interpreter i
 without looking at the source code and use part10.pas as your test input file.
 '''
 
+import codecs
+import mmap
+import operator
+import re
+import time
+from array import array
+
 # Token Types
 PROGRAM = 'PROGRAM'
+CONST = 'CONST'
 SEMI = 'SEMI'
 DOT = 'DOT'
 VAR = 'VAR'
@@ -16,6 +24,7 @@ REAL = 'REAL'
 BEGIN = 'BEGIN'
 END = 'END'
 ASSIGN = 'ASSIGN'
+EQUAL = 'EQUAL'
 PLUS = 'PLUS'
 MINUS = 'MINUS'
 MUL = 'MUL'
@@ -29,6 +38,8 @@ EOF = 'EOF'
 
 
 class Token(object):
+    __slots__ = ('type', 'value')
+
     def __init__(self, type, value):
         self.type = type
         self.value = value
@@ -61,21 +72,29 @@ class Lexer(object):
 
     def error(self):
         raise Exception(
-            'An error occurred while lexing the text. Current character: ' + self.current_char())
+            'An error occurred while lexing the text. Current character: ' + str(self.current_char()))
 
     def advance(self):
         self.pos += 1
 
-    def skip_whitespace(self):
-        while self.current_char() is not None and self.current_char().isspace():
-            self.advance()
-
-    def skip_comment(self):
-        while self.current_char() != '}':
-            if (self.current_char() is None):
-                self.error()
-            self.advance()
-        self.advance()
+    def skip_whitespace_and_comments(self):
+        # loops rather than recursing so any number of consecutive comments
+        # costs neither stack depth nor a call per comment
+        text = self.text
+        pos = self.pos
+        while pos < len(text):
+            char = text[pos]
+            if char.isspace():
+                pos += 1
+            elif char == '{':
+                end = text.find('}', pos)
+                if end == -1:
+                    self.pos = len(text)
+                    self.error()
+                pos = end + 1
+            else:
+                break
+        self.pos = pos
 
     def number(self):
         value = ''
@@ -99,6 +118,8 @@ class Lexer(object):
             self.advance()
         if (value.upper() == 'PROGRAM'):
             return Token(PROGRAM, value)
+        if (value.upper() == 'CONST'):
+            return Token(CONST, value)
         if (value.upper() == 'VAR'):
             return Token(VAR, value)
         if (value.upper() == 'BEGIN'):
@@ -114,11 +135,7 @@ class Lexer(object):
         return Token(ID, value)
 
     def get_next_token(self):
-        if (self.current_char() is not None and self.current_char().isspace()):
-            self.skip_whitespace()
-        if (self.current_char() == '{'):
-            self.skip_comment()
-            return self.get_next_token()
+        self.skip_whitespace_and_comments()
         if (self.current_char() is None):
             return Token(EOF, '')
         if (self.current_char().isdigit()):
@@ -165,6 +182,10 @@ class Lexer(object):
             token = Token(COLON, ':')
             self.advance()
             return token
+        if (self.current_char() == '='):
+            token = Token(EQUAL, '=')
+            self.advance()
+            return token
         if (self.current_char() == '.'):
             token = Token(DOT, '.')
             self.advance()
@@ -184,11 +205,247 @@ def lex(text):
     return tokens
 
 
+RESERVED_KEYWORDS = {
+    'PROGRAM': PROGRAM,
+    'CONST': CONST,
+    'VAR': VAR,
+    'BEGIN': BEGIN,
+    'END': END,
+    'DIV': INTEGER_DIV,
+    'REAL': REAL,
+    'INTEGER': INTEGER
+}
+
+SYMBOLS = {
+    '+': PLUS,
+    '-': MINUS,
+    '*': MUL,
+    '/': FLOAT_DIV,
+    '(': LPAREN,
+    ')': RPAREN,
+    ';': SEMI,
+    ',': COMMA,
+    ':': COLON,
+    ':=': ASSIGN,
+    '=': EQUAL,
+    '.': DOT
+}
+
+# Skips any run of whitespace and comments, then captures one lexeme. An
+# unterminated comment or unknown character is captured on its own so scan()
+# can report it, and the empty match at the end of the text is ignored.
+TOKEN_PATTERN = re.compile(
+    r'\s*(?:\{[^}]*\}\s*)*([^\W\d_][^\W_]*|:=|[-+*/();,:.=]|\d+(?:\.\d*)?|.|\Z)', re.DOTALL)
+
+
+# Tokens for lexemes that always mean the same thing are shared singletons.
+FIXED_TOKENS = dict((lexeme, Token(type, lexeme)) for lexeme, type in SYMBOLS.items())
+EOF_TOKEN = Token(EOF, '')
+
+
+def lexeme_token(lexeme):
+    char = lexeme[0]
+    if char.isdigit():
+        if '.' in lexeme:
+            return Token(REAL_CONST, float(lexeme))
+        return Token(INTEGER_CONST, int(lexeme))
+    if char.isalpha():
+        return Token(RESERVED_KEYWORDS.get(lexeme.upper(), ID), lexeme)
+    raise Exception(
+        'An error occurred while lexing the text. Current character: ' + char)
+
+
+def scan(text):
+    # lexeme -> token, so every occurrence of a spelling shares one Token and
+    # keyword folding happens once per distinct identifier
+    tokens = dict(FIXED_TOKENS)
+    for lexeme in TOKEN_PATTERN.findall(text):
+        token = tokens.get(lexeme)
+        if token is None:
+            if not lexeme:
+                continue
+            token = tokens[lexeme] = lexeme_token(lexeme)
+        yield token
+
+
+class RegexLexer(object):
+    '''
+    Drop-in replacement for Lexer that scans with TOKEN_PATTERN instead of
+    walking the text one character at a time. Produces the same tokens.
+    '''
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = scan(text)
+
+    def get_next_token(self):
+        return next(self.tokens, EOF_TOKEN)
+
+
+def fast_lex(text):
+    return list(scan(text))
+
+
+TOKEN_TYPES = (PROGRAM, CONST, SEMI, DOT, VAR, ID, COMMA, COLON, INTEGER, REAL, BEGIN, END,
+               ASSIGN, EQUAL, PLUS, MINUS, MUL, INTEGER_DIV, FLOAT_DIV, INTEGER_CONST,
+               REAL_CONST, LPAREN, RPAREN, EOF)
+TOKEN_CODES = dict((type, code) for code, type in enumerate(TOKEN_TYPES))
+FIXED_TOKENS_BY_CODE = [None] * len(TOKEN_TYPES)
+for fixed_token in FIXED_TOKENS.values():
+    FIXED_TOKENS_BY_CODE[TOKEN_CODES[fixed_token.type]] = fixed_token
+
+
+class TokenBuffer(object):
+    '''
+    Column-oriented token stream: a type code, value and source offset per
+    token, kept in arrays instead of one Token object per token. It also
+    works as a lexer, so a Parser can consume it directly. Tokens are
+    materialized one at a time as they are read, with fixed lexemes coming
+    back as the shared FIXED_TOKENS.
+    '''
+
+    def __init__(self):
+        self.types = array('B')
+        self.values = []
+        self.offsets = array('q')
+        self.pos = 0
+
+    def append(self, token, offset):
+        self.types.append(TOKEN_CODES[token.type])
+        self.values.append(token.value)
+        self.offsets.append(offset)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        code = self.types[index]
+        token = FIXED_TOKENS_BY_CODE[code]
+        if token is None:
+            token = Token(TOKEN_TYPES[code], self.values[index])
+        return token
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield self[index]
+
+    def get_next_token(self):
+        if self.pos >= len(self.types):
+            return EOF_TOKEN
+        self.pos += 1
+        return self[self.pos - 1]
+
+
+def lex_buffer(text):
+    buffer = TokenBuffer()
+    types = buffer.types.append
+    values = buffer.values.append
+    offsets = buffer.offsets.append
+    # lexeme -> (type code, value)
+    columns = dict((lexeme, (TOKEN_CODES[token.type], lexeme))
+                   for lexeme, token in FIXED_TOKENS.items())
+    for match in TOKEN_PATTERN.finditer(text):
+        lexeme = match.group(1)
+        column = columns.get(lexeme)
+        if column is None:
+            if not lexeme:
+                continue
+            token = lexeme_token(lexeme)
+            column = columns[lexeme] = (TOKEN_CODES[token.type], token.value)
+        types(column[0])
+        values(column[1])
+        offsets(match.start(1))
+    return buffer
+
+
+def read_chunks(source, chunk_size, encoding='utf-8'):
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+        return
+    decoder = codecs.getincrementaldecoder(encoding)()
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        view = memoryview(source)
+        for start in range(0, len(view), chunk_size):
+            yield decoder.decode(view[start:start + chunk_size])
+    else:
+        chunk = source.read(chunk_size)
+        while chunk:
+            if isinstance(chunk, str):
+                yield chunk
+            else:
+                yield decoder.decode(chunk)
+            chunk = source.read(chunk_size)
+    yield decoder.decode(b'', True)
+
+
+class StreamLexer(object):
+    '''
+    Lexer over a file object, bytes, memoryview or mmap that only ever holds
+    about one chunk of the source in memory. A match that runs into the end
+    of the buffer might continue in the next chunk (an identifier, a number,
+    ':' before '='), so it is retried once more text has been read. Comments
+    are skipped chunk by chunk without being buffered.
+    '''
+
+    def __init__(self, source, chunk_size=1 << 16, encoding='utf-8'):
+        self.chunks = read_chunks(source, chunk_size, encoding)
+        self.buffer = ''
+        self.pos = 0
+        self.exhausted = False
+        # spelling -> shared Token, for everything except number literals,
+        # which would otherwise grow without bound on generated sources
+        self.tokens = dict(FIXED_TOKENS)
+
+    def error(self):
+        raise Exception('An error occurred while lexing the text. Unterminated comment')
+
+    def fill(self, keep_from):
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.exhausted = True
+            chunk = ''
+        self.buffer = self.buffer[keep_from:] + chunk
+        self.pos = 0
+
+    def skip_comment(self, start):
+        end = self.buffer.find('}', start)
+        while end == -1:
+            if self.exhausted:
+                self.error()
+            self.buffer = ''
+            self.fill(0)
+            end = self.buffer.find('}')
+        self.pos = end + 1
+
+    def get_next_token(self):
+        while True:
+            match = TOKEN_PATTERN.match(self.buffer, self.pos)
+            lexeme = match.group(1)
+            if match.end() == len(self.buffer) and not self.exhausted:
+                self.fill(match.start(1))
+                continue
+            if lexeme == '{':
+                self.skip_comment(match.end())
+                continue
+            if not lexeme:
+                return EOF_TOKEN
+            self.pos = match.end()
+            token = self.tokens.get(lexeme)
+            if token is None:
+                token = lexeme_token(lexeme)
+                if token.type not in (INTEGER_CONST, REAL_CONST):
+                    self.tokens[lexeme] = token
+            return token
+
+
 class AST(object):
-    pass
+    __slots__ = ()
 
 
 class Program(AST):
+    __slots__ = ('name', 'block')
+
     def __init__(self, name, block):
         self.name = name
         self.block = block
@@ -201,6 +458,8 @@ class Program(AST):
 
 
 class Block(AST):
+    __slots__ = ('declarations', 'compound_statement')
+
     def __init__(self, declarations, compound_statement):
         self.declarations = declarations
         self.compound_statement = compound_statement
@@ -213,6 +472,8 @@ class Block(AST):
 
 
 class VarDecl(AST):
+    __slots__ = ('var_node', 'type_node')
+
     def __init__(self, var_node, type_node):
         self.var_node = var_node
         self.type_node = type_node
@@ -224,19 +485,40 @@ class VarDecl(AST):
         return isinstance(obj, VarDecl) and obj.var_node == self.var_node and obj.type_node == self.type_node
 
 
+class ConstDecl(AST):
+    __slots__ = ('var_node', 'value')
+
+    def __init__(self, var_node, value):
+        self.var_node = var_node
+        self.value = value
+
+    def __repr__(self):
+        return 'ConstDecl(' + str(self.var_node) + ', ' + str(self.value) + ')'
+
+    def __eq__(self, obj):
+        return isinstance(obj, ConstDecl) and obj.var_node == self.var_node and obj.value == self.value
+
+
 class Type(AST):
+    __slots__ = ('token',)
+
     def __init__(self, token):
         self.token = token
-        self.value = token.value
+
+    @property
+    def value(self):
+        return self.token.value
 
     def __repr__(self):
         return 'Type(' + str(self.token) + ', ' + str(self.token) + ')'
 
     def __eq__(self, obj):
-        return isinstance(obj, Type) and obj.token == self.token and obj.value == self.value
+        return isinstance(obj, Type) and obj.token == self.token
 
 
 class Compound(AST):
+    __slots__ = ('children',)
+
     def __init__(self, children):
         self.children = children
 
@@ -248,10 +530,18 @@ class Compound(AST):
 
 
 class Assign(AST):
+    __slots__ = ('left', 'token', 'right', 'static_type')
+
     def __init__(self, left, op, right):
         self.left = left
-        self.token = self.op = op
+        self.token = op
         self.right = right
+        # type of the target once a TypeChecker has seen the node
+        self.static_type = None
+
+    @property
+    def op(self):
+        return self.token
 
     def __repr__(self):
         return 'Assign(' + str(self.left) + ', ' + str(self.token) + ', ' + str(self.right) + ')'
@@ -261,10 +551,17 @@ class Assign(AST):
 
 
 class BinOp(AST):
+    __slots__ = ('left', 'token', 'right', 'static_type')
+
     def __init__(self, left, op, right):
         self.left = left
-        self.token = self.op = op
+        self.token = op
         self.right = right
+        self.static_type = None
+
+    @property
+    def op(self):
+        return self.token
 
     def __repr__(self):
         return 'BinOp(' + str(self.left) + ', ' + str(self.token) + ', ' + str(self.right) + ')'
@@ -274,21 +571,34 @@ class BinOp(AST):
 
 
 class Num(AST):
+    __slots__ = ('token', 'static_type')
+
     def __init__(self, token):
         self.token = token
-        self.value = token.value
+        self.static_type = None
+
+    @property
+    def value(self):
+        return self.token.value
 
     def __repr__(self):
         return 'Num(' + str(self.token) + ', ' + str(self.value) + ')'
 
     def __eq__(self, obj):
-        return isinstance(obj, Num) and obj.token == self.token and obj.value == self.value
+        return isinstance(obj, Num) and obj.token == self.token
 
 
 class UnaryOp(AST):
+    __slots__ = ('token', 'expr', 'static_type')
+
     def __init__(self, op, expr):
-        self.token = self.op = op
+        self.token = op
         self.expr = expr
+        self.static_type = None
+
+    @property
+    def op(self):
+        return self.token
 
     def __repr__(self):
         return 'UnaryOp(' + str(self.token) + ', ' + str(self.expr) + ')'
@@ -298,24 +608,211 @@ class UnaryOp(AST):
 
 
 class Var(AST):
+    __slots__ = ('token', 'slot', 'static_type')
+
     def __init__(self, token):
         self.token = token
-        self.value = token.value
+        # index into the SlotInterpreter's values, set by SlotResolver
+        self.slot = -1
+        # INTEGER or REAL once a TypeChecker has seen the node
+        self.static_type = None
+
+    @property
+    def value(self):
+        return self.token.value
 
     def __repr__(self):
         return 'Var(' + str(self.token) + ', ' + str(self.value) + ')'
 
     def __eq__(self, obj):
-        return isinstance(obj, Var) and obj.token == self.token and obj.value == self.value
+        return isinstance(obj, Var) and obj.token == self.token
 
 
 class NoOp(AST):
-    pass
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'NoOp()'
+
+    def __eq__(self, obj):
+        return isinstance(obj, NoOp)
+
+
+class TreeBuilder(object):
+    '''
+    The node constructors a Parser builds with. ArenaBuilder provides the
+    same names for building into an ASTArena instead.
+    '''
+    Program = Program
+    Block = Block
+    VarDecl = VarDecl
+    ConstDecl = ConstDecl
+    Type = Type
+    Compound = Compound
+    Assign = Assign
+    BinOp = BinOp
+    UnaryOp = UnaryOp
+    Num = Num
+    Var = Var
+    NoOp = NoOp
+
+
+PROGRAM_NODE, BLOCK_NODE, VAR_DECL_NODE, CONST_DECL_NODE, TYPE_NODE, COMPOUND_NODE, \
+    ASSIGN_NODE, BIN_OP_NODE, UNARY_OP_NODE, NUM_NODE, VAR_NODE, NO_OP_NODE = range(12)
+
+
+class ASTArena(object):
+    '''
+    Flat AST: node i has kind kinds[i] and up to three int operands a[i],
+    b[i], c[i], which index other nodes, the constants pool, the children
+    array or TOKEN_TYPES:
+
+        Program     a: name constant    b: block
+        Block       a, b: start and count of declarations in children
+                    c: compound statement
+        VarDecl     a: var              b: type
+        ConstDecl   a: var              b: value expression
+        Type        a: value constant   c: token type code
+        Compound    a, b: start and count of statements in children
+        Assign      a: var              b: expression
+        BinOp       a: left             b: right    c: operator token code
+        UnaryOp     a: operand          c: operator token code
+        Num         a: value constant   c: token type code
+        Var         a: name constant
+
+    It is also a node builder, so a Parser can emit straight into it; each
+    constructor returns the index of the node it added.
+    '''
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.a = array('i')
+        self.b = array('i')
+        self.c = array('i')
+        self.children = array('i')
+        self.constants = []
+        # (type, value) -> index, so 1 and 1.0 keep separate entries
+        self.constant_indices = {}
+        self.root = None
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def add(self, kind, a=0, b=0, c=0):
+        self.kinds.append(kind)
+        self.a.append(a)
+        self.b.append(b)
+        self.c.append(c)
+        return len(self.kinds) - 1
+
+    def constant(self, value):
+        key = (type(value), value)
+        index = self.constant_indices.get(key)
+        if index is None:
+            index = self.constant_indices[key] = len(self.constants)
+            self.constants.append(value)
+        return index
+
+    def child_list(self, nodes):
+        start = len(self.children)
+        self.children.extend(nodes)
+        return start
+
+    def Program(self, name, block):
+        self.root = self.add(PROGRAM_NODE, self.constant(name), block)
+        return self.root
+
+    def Block(self, declarations, compound_statement):
+        return self.add(BLOCK_NODE, self.child_list(declarations), len(declarations), compound_statement)
+
+    def VarDecl(self, var_node, type_node):
+        return self.add(VAR_DECL_NODE, var_node, type_node)
+
+    def ConstDecl(self, var_node, value):
+        return self.add(CONST_DECL_NODE, var_node, value)
+
+    def Type(self, token):
+        return self.add(TYPE_NODE, self.constant(token.value), 0, TOKEN_CODES[token.type])
+
+    def Compound(self, children):
+        return self.add(COMPOUND_NODE, self.child_list(children), len(children))
+
+    def Assign(self, left, op, right):
+        return self.add(ASSIGN_NODE, left, right)
+
+    def BinOp(self, left, op, right):
+        return self.add(BIN_OP_NODE, left, right, TOKEN_CODES[op.type])
+
+    def UnaryOp(self, op, expr):
+        return self.add(UNARY_OP_NODE, expr, 0, TOKEN_CODES[op.type])
+
+    def Num(self, token):
+        return self.add(NUM_NODE, self.constant(token.value), 0, TOKEN_CODES[token.type])
+
+    def Var(self, token):
+        return self.add(VAR_NODE, self.constant(token.value))
+
+    def NoOp(self):
+        return self.add(NO_OP_NODE)
+
+    def to_ast(self, index=None):
+        '''
+        Rebuilds node objects, e.g. for comparing against parse(). Operator
+        tokens come back with their canonical spelling ('DIV').
+        '''
+        if index is None:
+            index = self.root
+        kind, a, b, c = self.kinds[index], self.a[index], self.b[index], self.c[index]
+        if kind == PROGRAM_NODE:
+            return Program(self.constants[a], self.to_ast(b))
+        if kind == BLOCK_NODE:
+            return Block([self.to_ast(child) for child in self.children[a:a + b]], self.to_ast(c))
+        if kind == VAR_DECL_NODE:
+            return VarDecl(self.to_ast(a), self.to_ast(b))
+        if kind == CONST_DECL_NODE:
+            return ConstDecl(self.to_ast(a), self.to_ast(b))
+        if kind == TYPE_NODE:
+            return Type(Token(TOKEN_TYPES[c], self.constants[a]))
+        if kind == COMPOUND_NODE:
+            return Compound([self.to_ast(child) for child in self.children[a:a + b]])
+        if kind == ASSIGN_NODE:
+            return Assign(self.to_ast(a), FIXED_TOKENS[':='], self.to_ast(b))
+        if kind == BIN_OP_NODE:
+            return BinOp(self.to_ast(a), self.operator_token(c), self.to_ast(b))
+        if kind == UNARY_OP_NODE:
+            return UnaryOp(self.operator_token(c), self.to_ast(a))
+        if kind == NUM_NODE:
+            return Num(Token(TOKEN_TYPES[c], self.constants[a]))
+        if kind == VAR_NODE:
+            return Var(Token(ID, self.constants[a]))
+        return NoOp()
+
+    def operator_token(self, code):
+        token = FIXED_TOKENS_BY_CODE[code]
+        if token is None:
+            token = Token(TOKEN_TYPES[code], 'DIV')
+        return token
+
+
+# Binary operator token type -> precedence. Higher levels bind tighter and
+# every level is left associative, so a new operator only needs an entry here.
+BINARY_PRECEDENCE = {
+    PLUS: 1,
+    MINUS: 1,
+    MUL: 2,
+    INTEGER_DIV: 2,
+    FLOAT_DIV: 2
+}
+
+UNARY_OPERATORS = frozenset([PLUS, MINUS])
 
 
 class Parser(object):
-    def __init__(self, lexer):
+    def __init__(self, lexer, nodes=TreeBuilder):
         self.lexer = lexer
+        self.nodes = nodes
+        # names declared in the CONST section, which may not be assigned
+        self.constants = set()
         self.current_token = self.lexer.get_next_token()
 
     def error(self, msg):
@@ -331,19 +828,24 @@ class Parser(object):
 
     def program(self):
         self.eat(PROGRAM)
-        var = self.variable()
+        name = self.eat(ID).value
         self.eat(SEMI)
         block = self.block()
         self.eat(DOT)
-        return Program(var.value, block)
+        return self.nodes.Program(name, block)
 
     def block(self):
         declarations = self.declarations()
         compound_statement = self.compound_statement()
-        return Block(declarations, compound_statement)
+        return self.nodes.Block(declarations, compound_statement)
 
     def declarations(self):
         decls = []
+        if self.current_token.type == CONST:
+            self.eat(CONST)
+            while (self.current_token.type == ID):
+                decls.append(self.constant_declaration())
+                self.eat(SEMI)
         if self.current_token.type == VAR:
             self.eat(VAR)
             while (self.current_token.type == ID):
@@ -351,20 +853,33 @@ class Parser(object):
                 self.eat(SEMI)
         return decls
 
+    def constant_declaration(self):
+        self.check_not_constant()
+        token = self.eat(ID)
+        self.constants.add(token.value)
+        self.eat(EQUAL)
+        return self.nodes.ConstDecl(self.nodes.Var(token), self.expr())
+
     def variable_declaration(self):
+        self.check_not_constant()
         vars = [self.variable()]
         while self.current_token.type == COMMA:
             self.eat(COMMA)
+            self.check_not_constant()
             vars.append(self.variable())
         self.eat(COLON)
         type = self.type_spec()
-        return [VarDecl(var, type) for var in vars]
+        return [self.nodes.VarDecl(var, type) for var in vars]
+
+    def check_not_constant(self):
+        if self.current_token.value in self.constants:
+            self.error('duplicate declaration of constant ' + self.current_token.value)
 
     def type_spec(self):
         if self.current_token.type == INTEGER:
-            return Type(self.eat(INTEGER))
+            return self.nodes.Type(self.eat(INTEGER))
         if self.current_token.type == REAL:
-            return Type(self.eat(REAL))
+            return self.nodes.Type(self.eat(REAL))
         self.error()
 
     def compound_statement(self):
@@ -373,7 +888,7 @@ class Parser(object):
         if self.current_token.type == SEMI:
             self.eat(SEMI)
         self.eat(END)
-        return Compound(stmt_list)
+        return self.nodes.Compound(stmt_list)
 
     def statement_list(self):
         stmts = [self.statement()]
@@ -390,58 +905,46 @@ class Parser(object):
         return self.empty()
 
     def assignment_statement(self):
+        if self.current_token.value in self.constants:
+            self.error('cannot assign to constant ' + self.current_token.value)
         left = self.variable()
         token = self.eat(ASSIGN)
         right = self.expr()
-        return Assign(left, token, right)
+        return self.nodes.Assign(left, token, right)
 
     def empty(self):
-        return NoOp()
+        return self.nodes.NoOp()
 
-    def expr(self):
-        node = self.term()
-        while self.current_token.type in [PLUS, MINUS]:
-            if self.current_token.type == PLUS:
-                token = self.eat(PLUS)
-            if self.current_token.type == MINUS:
-                token = self.eat(MINUS)
-            node = BinOp(node, token, self.term())
-        return node
-
-    def term(self):
+    def expr(self, min_precedence=1):
+        # precedence climbing: each BINARY_PRECEDENCE level costs a call only
+        # when an operator of that level actually appears
         node = self.factor()
-        while self.current_token.type in [MUL, INTEGER_DIV, FLOAT_DIV]:
-            if self.current_token.type == MUL:
-                token = self.eat(MUL)
-            if self.current_token.type == INTEGER_DIV:
-                token = self.eat(INTEGER_DIV)
-            if self.current_token.type == FLOAT_DIV:
-                token = self.eat(FLOAT_DIV)
-            node = BinOp(node, token, self.factor())
+        precedence = BINARY_PRECEDENCE.get(self.current_token.type)
+        while precedence is not None and precedence >= min_precedence:
+            token = self.eat(self.current_token.type)
+            node = self.nodes.BinOp(node, token, self.expr(precedence + 1))
+            precedence = BINARY_PRECEDENCE.get(self.current_token.type)
         return node
 
     def factor(self):
-        if self.current_token.type == PLUS:
-            return UnaryOp(self.eat(PLUS), self.factor())
-        if self.current_token.type == MINUS:
-            return UnaryOp(self.eat(MINUS), self.factor())
-        if self.current_token.type == INTEGER_CONST:
-            return Num(self.eat(INTEGER_CONST))
-        if self.current_token.type == REAL_CONST:
-            return Num(self.eat(REAL_CONST))
-        if self.current_token.type == LPAREN:
+        type = self.current_token.type
+        if type in UNARY_OPERATORS:
+            return self.nodes.UnaryOp(self.eat(type), self.factor())
+        if type == ID:
+            return self.nodes.Var(self.eat(ID))
+        if type == INTEGER_CONST or type == REAL_CONST:
+            return self.nodes.Num(self.eat(type))
+        if type == LPAREN:
             self.eat(LPAREN)
             node = self.expr()
             self.eat(RPAREN)
             return node
-        if self.current_token.type == ID:
-            return Var(self.eat(ID))
         self.error('unexpected factor. current token: ' +
                    str(self.current_token))
 
     def variable(self):
         node = self.eat(ID)
-        return Var(node)
+        return self.nodes.Var(node)
 
     def parse(self):
         node = self.program()
@@ -451,15 +954,122 @@ class Parser(object):
         return node
 
 
-def parse(text):
+class IterativeParser(Parser):
+    '''
+    Parser that builds the same trees as Parser without recursing on nesting
+    depth: parenthesized expressions and unary chains go through an operator
+    stack, and nested BEGIN ... END blocks through a stack of statement lists.
+    '''
+
+    def expr(self):
+        operands = []
+        # (precedence, token) for binary operators, (None, token) for unary
+        # ones, and None for an open parenthesis
+        operators = []
+        depth = 0
+        while True:
+            type = self.current_token.type
+            while type == LPAREN or type in UNARY_OPERATORS:
+                if type == LPAREN:
+                    self.eat(LPAREN)
+                    operators.append(None)
+                    depth += 1
+                else:
+                    operators.append((None, self.eat(type)))
+                type = self.current_token.type
+            if type == ID:
+                operands.append(self.nodes.Var(self.eat(ID)))
+            elif type == INTEGER_CONST or type == REAL_CONST:
+                operands.append(self.nodes.Num(self.eat(type)))
+            else:
+                self.error('unexpected factor. current token: ' +
+                           str(self.current_token))
+            while True:
+                # a finished factor completes every prefix operator before it
+                while operators and operators[-1] is not None and operators[-1][0] is None:
+                    operands.append(self.nodes.UnaryOp(operators.pop()[1], operands.pop()))
+                if self.current_token.type != RPAREN or depth == 0:
+                    break
+                self.reduce(operands, operators, 0)
+                operators.pop()
+                depth -= 1
+                self.eat(RPAREN)
+            precedence = BINARY_PRECEDENCE.get(self.current_token.type)
+            if precedence is None:
+                break
+            self.reduce(operands, operators, precedence)
+            operators.append((precedence, self.eat(self.current_token.type)))
+        if depth:
+            self.eat(RPAREN)
+        self.reduce(operands, operators, 0)
+        return operands.pop()
+
+    def reduce(self, operands, operators, min_precedence):
+        while operators and operators[-1] is not None and operators[-1][0] >= min_precedence:
+            right = operands.pop()
+            operands.append(self.nodes.BinOp(operands.pop(), operators.pop()[1], right))
+
+    def compound_statement(self):
+        self.eat(BEGIN)
+        stack = [[]]
+        while True:
+            type = self.current_token.type
+            if type == BEGIN:
+                self.eat(BEGIN)
+                stack.append([])
+                continue
+            if type == ID:
+                stack[-1].append(self.assignment_statement())
+            else:
+                stack[-1].append(self.empty())
+            # every block whose statement list just ended is closed here
+            while self.current_token.type != SEMI:
+                self.eat(END)
+                node = self.nodes.Compound(stack.pop())
+                if not stack:
+                    return node
+                stack[-1].append(node)
+            self.eat(SEMI)
+
+
+def parse(text, iterative=False):
     lexer = Lexer(text)
+    if iterative:
+        return IterativeParser(lexer).parse()
     return Parser(lexer).parse()
 
 
+def parse_arena(text, iterative=False):
+    arena = ASTArena()
+    if iterative:
+        IterativeParser(RegexLexer(text), arena).parse()
+    else:
+        Parser(RegexLexer(text), arena).parse()
+    return arena
+
+
 class NodeVisitor(object):
+    # node class -> visit_ function, per visitor class
+    visitors = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.visitors = {}
+
     def visit(self, node):
-        method_name = "visit_{}".format(type(node).__name__)
-        return getattr(self, method_name)(node)
+        visitor = self.visitors.get(type(node))
+        if visitor is None:
+            visitor = self.resolve_visitor(type(node))
+        return visitor(self, node)
+
+    @classmethod
+    def resolve_visitor(cls, node_class):
+        visitor = getattr(cls, 'visit_' + node_class.__name__, cls.generic_visit)
+        cls.visitors[node_class] = visitor
+        return visitor
+
+    def generic_visit(self, node):
+        raise Exception('No visit_{} method'.format(type(node).__name__))
 
 
 class Interpreter(NodeVisitor):
@@ -483,6 +1093,9 @@ class Interpreter(NodeVisitor):
             initial_value = 0.0
         self.scope[var_decl.var_node.value] = initial_value
 
+    def visit_ConstDecl(self, const_decl):
+        self.scope[const_decl.var_node.value] = self.visit(const_decl.value)
+
     def visit_Compound(self, compound):
         for child in compound.children:
             self.visit(child)
@@ -527,9 +1140,552 @@ class Interpreter(NodeVisitor):
         self.visit(node)
 
 
-def evaluate(text):
+class LimitExceeded(Exception):
+    pass
+
+
+class NodeLimitExceeded(LimitExceeded):
+    pass
+
+
+class DeadlineExceeded(LimitExceeded):
+    pass
+
+
+class IntegerTooLarge(LimitExceeded):
+    pass
+
+
+class TooManyVariables(LimitExceeded):
+    pass
+
+
+class Limits(object):
+    '''Resource limits for a LimitedInterpreter; None means unlimited.'''
+
+    def __init__(self, max_nodes=None, timeout=None, max_int_bits=None, max_variables=None):
+        self.max_nodes = max_nodes
+        # seconds of wall-clock time from the start of the program
+        self.timeout = timeout
+        self.max_int_bits = max_int_bits
+        self.max_variables = max_variables
+
+
+class LimitedInterpreter(Interpreter):
+    '''
+    An Interpreter that enforces Limits. Nodes are counted as they are
+    visited, but the node budget and the deadline are only compared after
+    each statement, so one statement may overshoot them by as long as its
+    own evaluation takes. Without max_int_bits that is unbounded, since
+    big integer arithmetic gets slower as the numbers grow; with it, every
+    literal and every intermediate result is checked, so each operation
+    works on bounded operands.
+    '''
+
+    def __init__(self, parser, limits):
+        Interpreter.__init__(self, parser)
+        self.limits = limits
+        # nodes evaluated so far
+        self.nodes = 0
+        self.deadline = None
+        # variable whose value is being computed, for error messages
+        self.target = None
+
+    def visit(self, node):
+        # NodeVisitor.visit inlined, this runs for every node
+        self.nodes += 1
+        visitor = self.visitors.get(type(node))
+        if visitor is None:
+            visitor = self.resolve_visitor(type(node))
+        return visitor(self, node)
+
+    def visit_Program(self, program):
+        if self.limits.timeout is not None:
+            self.deadline = time.monotonic() + self.limits.timeout
+        self.visit(program.block)
+
+    def visit_VarDecl(self, var_decl):
+        Interpreter.visit_VarDecl(self, var_decl)
+        self.check_variables()
+
+    def visit_ConstDecl(self, const_decl):
+        self.target = const_decl.var_node.value
+        self.store(const_decl.var_node.value, self.visit(const_decl.value))
+
+    def visit_Compound(self, compound):
+        max_nodes = self.limits.max_nodes
+        deadline = self.deadline
+        for child in compound.children:
+            self.visit(child)
+            if max_nodes is not None and self.nodes > max_nodes:
+                raise NodeLimitExceeded('Evaluated more than ' + str(max_nodes) + ' nodes')
+            if deadline is not None and time.monotonic() > deadline:
+                raise DeadlineExceeded('Ran longer than ' + str(self.limits.timeout) + ' seconds')
+
+    def visit_Assign(self, assign):
+        self.target = assign.left.value
+        self.store(assign.left.value, self.visit(assign.right))
+
+    def visit_Num(self, num):
+        return self.check_int(num.value)
+
+    def visit_BinOp(self, bin_op):
+        return self.check_int(Interpreter.visit_BinOp(self, bin_op))
+
+    def check_int(self, value):
+        max_int_bits = self.limits.max_int_bits
+        if max_int_bits is not None and type(value) is int and value.bit_length() > max_int_bits:
+            raise IntegerTooLarge('Value computed for ' + self.target + ' is wider than ' + str(max_int_bits) + ' bits')
+        return value
+
+    def store(self, name, value):
+        # literals and operator results are checked already, and negation
+        # keeps the width
+        self.scope[name] = value
+        self.check_variables()
+
+    def check_variables(self):
+        max_variables = self.limits.max_variables
+        if max_variables is not None and len(self.scope) > max_variables:
+            raise TooManyVariables('More than ' + str(max_variables) + ' variables')
+
+
+def variables(node, names=None):
+    '''Names an expression reads.'''
+    if names is None:
+        names = set()
+    if isinstance(node, Var):
+        names.add(node.value)
+    elif isinstance(node, BinOp):
+        variables(node.left, names)
+        variables(node.right, names)
+    elif isinstance(node, UnaryOp):
+        variables(node.expr, names)
+    return names
+
+
+def value_type(node, types):
+    '''
+    int or float, the Python type an expression evaluates to, or None if it
+    is not known. types maps every bound variable to its type or None.
+    '''
+    if isinstance(node, Num):
+        return type(node.value)
+    if isinstance(node, Var):
+        return types.get(node.value)
+    if isinstance(node, UnaryOp):
+        return value_type(node.expr, types)
+    left = value_type(node.left, types)
+    right = value_type(node.right, types)
+    if left is None or right is None:
+        return None
+    if node.op.type == FLOAT_DIV or left is float or right is float:
+        return float
+    return int
+
+
+def small_literal(node):
+    # converts to float without overflowing
+    return isinstance(node, Num) and (type(node.value) is float or node.value.bit_length() <= 1000)
+
+
+def can_fail(node, types):
+    '''
+    Whether evaluating an expression might raise: reading a variable that
+    is not bound yet (not in types), dividing by anything but a non-zero
+    literal, or an operation that converts an int to float, which overflows
+    for large ints, unless both operands are small literals.
+    '''
+    if isinstance(node, Var):
+        return node.value not in types
+    if isinstance(node, UnaryOp):
+        return can_fail(node.expr, types)
+    if not isinstance(node, BinOp):
+        return False
+    if can_fail(node.left, types) or can_fail(node.right, types):
+        return True
+    literals = small_literal(node.left) and small_literal(node.right)
+    if node.op.type in (INTEGER_DIV, FLOAT_DIV) and not (isinstance(node.right, Num) and node.right.value):
+        return True
+    if node.op.type == FLOAT_DIV:
+        return not literals
+    left = value_type(node.left, types)
+    right = value_type(node.right, types)
+    if left is None or right is None or left is not right:
+        return not literals
+    return False
+
+
+def flatten(compound, statements=None):
+    if statements is None:
+        statements = []
+    for child in compound.children:
+        if isinstance(child, Compound):
+            flatten(child, statements)
+        elif isinstance(child, Assign):
+            statements.append(child)
+    return statements
+
+
+class DefUse(object):
+    '''
+    Def-use facts for a program's statements, flattened into one list of
+    assignments (the language has no control flow, so that list is the
+    execution order): what each statement defines and reads, and whether it
+    might raise, given the types its inputs have at that point.
+    '''
+
+    def __init__(self, program):
+        self.declarations = program.block.declarations
+        self.statements = flatten(program.block.compound_statement)
+        self.defines = [statement.left.value for statement in self.statements]
+        self.uses = [variables(statement.right) for statement in self.statements]
+        self.may_fail = []
+        # bound name -> int, float or None; straight-line code makes the
+        # type of every value known wherever the types of the inputs are
+        types = {}
+        for decl in self.declarations:
+            if isinstance(decl, ConstDecl):
+                types[decl.var_node.value] = value_type(decl.value, types)
+            elif decl.type_node.token.type == INTEGER:
+                types[decl.var_node.value] = int
+            else:
+                types[decl.var_node.value] = float
+        for statement in self.statements:
+            self.may_fail.append(can_fail(statement.right, types))
+            types[statement.left.value] = value_type(statement.right, types)
+        self.names = set(types)
+
+
+def eliminate_dead_stores(program, outputs=None):
+    '''
+    Drops assignments whose value is overwritten before it is read. With
+    outputs=None every variable's final value stays observable; otherwise
+    only the named outputs are. Stores that might raise are always kept.
+    '''
+    facts = DefUse(program)
+    if outputs is None:
+        live = set(facts.names)
+    else:
+        live = set(outputs)
+    kept = []
+    for index in range(len(facts.statements) - 1, -1, -1):
+        name = facts.defines[index]
+        statement = facts.statements[index]
+        if name not in live and not facts.may_fail[index]:
+            continue
+        live.discard(name)
+        live |= facts.uses[index]
+        kept.append(statement)
+    kept.reverse()
+    return Program(program.name, Block(program.block.declarations, Compound(kept)))
+
+
+def evaluate(text, limits=None, want=None):
+    '''
+    Runs a program and returns its final scope. Given want, a list of
+    names, only those variables are returned, and only the statements they
+    depend on are run: eliminate_dead_stores() with want as the outputs.
+    A statement that can_fail() cannot prove safe runs whether or not it is
+    wanted, together with the statements it reads, so it sees the values it
+    would in a full run and raises the same error. Limits are about the
+    whole program, so with limits every statement runs.
+    '''
     lexer = Lexer(text)
     parser = Parser(lexer)
-    interpreter = Interpreter(parser)
+    if limits is None:
+        interpreter = Interpreter(parser)
+    else:
+        interpreter = LimitedInterpreter(parser, limits)
+    if want is None:
+        interpreter.interpret()
+        return interpreter.scope
+    program = parser.parse()
+    if limits is None:
+        program = eliminate_dead_stores(program, outputs=want)
+    interpreter.visit(program)
+    return dict((name, interpreter.scope[name]) for name in want if name in interpreter.scope)
+
+
+# value of a slot that has not been declared or assigned yet
+UNSET = object()
+
+
+class SlotResolver(NodeVisitor):
+    '''
+    Numbers the variables of a program and stores the number on every Var
+    node that names them. Names are matched exactly, as the Interpreter's
+    scope keys them, so x and X get different slots.
+    '''
+
+    def __init__(self):
+        # name -> slot
+        self.slots = {}
+        # slot -> name
+        self.names = []
+
+    def resolve(self, var):
+        slot = self.slots.get(var.value)
+        if slot is None:
+            slot = self.slots[var.value] = len(self.names)
+            self.names.append(var.value)
+        var.slot = slot
+        return slot
+
+    def visit_Program(self, program):
+        self.visit(program.block)
+        return self
+
+    def visit_Block(self, block):
+        for decl in block.declarations:
+            self.visit(decl)
+        self.visit(block.compound_statement)
+
+    def visit_VarDecl(self, var_decl):
+        self.resolve(var_decl.var_node)
+
+    def visit_ConstDecl(self, const_decl):
+        self.visit(const_decl.value)
+        self.resolve(const_decl.var_node)
+
+    def visit_Compound(self, compound):
+        for child in compound.children:
+            self.visit(child)
+
+    def visit_Assign(self, assign):
+        self.visit(assign.right)
+        self.resolve(assign.left)
+
+    def visit_Var(self, var):
+        self.resolve(var)
+
+    def visit_BinOp(self, bin_op):
+        self.visit(bin_op.left)
+        self.visit(bin_op.right)
+
+    def visit_UnaryOp(self, unary_op):
+        self.visit(unary_op.expr)
+
+    def visit_Num(self, num):
+        pass
+
+    def visit_NoOp(self, no_op):
+        pass
+
+
+def resolve(program):
+    return SlotResolver().visit(program)
+
+
+class SlotInterpreter(Interpreter):
+    '''
+    Runs a program against a list indexed by the slots SlotResolver put on
+    its Var nodes. The scope dict is only built when asked for. Pass the
+    resolver of an already resolved tree to run it again without resolving.
+    Every slot starts UNSET and declarations run in order, as they do in
+    the Interpreter, so a CONST cannot read a VAR declared after it.
+    '''
+
+    def __init__(self, parser, resolver=None):
+        self.parser = parser
+        self.resolver = resolver
+        self.names = []
+        self.values = []
+
+    @property
+    def scope(self):
+        return dict((name, value) for name, value in zip(self.names, self.values) if value is not UNSET)
+
+    def visit_Program(self, program):
+        if self.resolver is None:
+            self.resolver = resolve(program)
+        self.names = self.resolver.names
+        self.values = [UNSET] * len(self.names)
+        self.visit(program.block)
+
+    def visit_VarDecl(self, var_decl):
+        if var_decl.type_node.token.type == INTEGER:
+            self.values[var_decl.var_node.slot] = 0
+        else:
+            self.values[var_decl.var_node.slot] = 0.0
+
+    def visit_ConstDecl(self, const_decl):
+        self.values[const_decl.var_node.slot] = self.visit(const_decl.value)
+
+    def visit_Assign(self, assign):
+        self.values[assign.left.slot] = self.visit(assign.right)
+
+    def visit_Var(self, var):
+        value = self.values[var.slot]
+        if value is UNSET:
+            raise KeyError(var.value)
+        return value
+
+
+class TreeCopier(NodeVisitor):
+    '''Copies a tree node by node; tokens are immutable and stay shared.'''
+
+    def visit_Program(self, program):
+        return Program(program.name, self.visit(program.block))
+
+    def visit_Block(self, block):
+        return Block([self.visit(decl) for decl in block.declarations], self.visit(block.compound_statement))
+
+    def visit_VarDecl(self, var_decl):
+        return VarDecl(self.visit(var_decl.var_node), Type(var_decl.type_node.token))
+
+    def visit_ConstDecl(self, const_decl):
+        return ConstDecl(self.visit(const_decl.var_node), self.visit(const_decl.value))
+
+    def visit_Compound(self, compound):
+        return Compound([self.visit(child) for child in compound.children])
+
+    def visit_Assign(self, assign):
+        return Assign(self.visit(assign.left), assign.op, self.visit(assign.right))
+
+    def visit_BinOp(self, bin_op):
+        return BinOp(self.visit(bin_op.left), bin_op.op, self.visit(bin_op.right))
+
+    def visit_UnaryOp(self, unary_op):
+        return UnaryOp(unary_op.op, self.visit(unary_op.expr))
+
+    def visit_Num(self, num):
+        return Num(num.token)
+
+    def visit_Var(self, var):
+        return Var(var.token)
+
+    def visit_NoOp(self, no_op):
+        return NoOp()
+
+
+class CompiledProgram(object):
+    '''
+    A parsed program with its variables resolved to slots. It is never
+    changed after construction, so one instance can be run any number of
+    times, from any number of threads at once; everything a run changes
+    lives in that run's RunState. The slots are written on a private copy
+    of the tree, so the caller's nodes, which other trees may share, are
+    left alone.
+    '''
+    __slots__ = ('program', 'names')
+
+    def __init__(self, program):
+        program = TreeCopier().visit(program)
+        resolver = resolve(program)
+        object.__setattr__(self, 'program', program)
+        object.__setattr__(self, 'names', tuple(resolver.names))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('CompiledProgram is immutable')
+
+    def run(self):
+        return RunState(self).run()
+
+
+class RunState(SlotInterpreter):
+    '''The per-run half of a CompiledProgram: its variable values.'''
+
+    def __init__(self, compiled):
+        self.parser = None
+        self.resolver = None
+        self.compiled = compiled
+        self.names = compiled.names
+        self.values = [UNSET] * len(compiled.names)
+
+    def run(self):
+        self.visit(self.compiled.program.block)
+        return self.scope
+
+
+def compile_text(text):
+    return CompiledProgram(Parser(RegexLexer(text)).parse())
+
+
+def evaluate_resolved(text):
+    interpreter = SlotInterpreter(Parser(RegexLexer(text)))
     interpreter.interpret()
     return interpreter.scope
+
+
+BINARY_OPERATIONS = {
+    PLUS: operator.add,
+    MINUS: operator.sub,
+    MUL: operator.mul,
+    INTEGER_DIV: operator.floordiv,
+    FLOAT_DIV: operator.truediv
+}
+
+UNARY_OPERATIONS = {
+    PLUS: operator.pos,
+    MINUS: operator.neg
+}
+
+
+class ArenaInterpreter(object):
+    def __init__(self, arena):
+        self.arena = arena
+        self.scope = {}
+        # token code -> function, matching the codes stored in arena.c
+        self.binary = [BINARY_OPERATIONS.get(type) for type in TOKEN_TYPES]
+        self.unary = [UNARY_OPERATIONS.get(type) for type in TOKEN_TYPES]
+
+    def execute(self, index):
+        arena = self.arena
+        kind = arena.kinds[index]
+        if kind == ASSIGN_NODE:
+            name = arena.constants[arena.a[arena.a[index]]]
+            self.scope[name] = self.evaluate(arena.b[index])
+        elif kind == COMPOUND_NODE:
+            start = arena.a[index]
+            for child in arena.children[start:start + arena.b[index]]:
+                self.execute(child)
+        elif kind == BLOCK_NODE:
+            start = arena.a[index]
+            for decl in arena.children[start:start + arena.b[index]]:
+                name = arena.constants[arena.a[arena.a[decl]]]
+                if arena.kinds[decl] == CONST_DECL_NODE:
+                    self.scope[name] = self.evaluate(arena.b[decl])
+                elif TOKEN_TYPES[arena.c[arena.b[decl]]] == INTEGER:
+                    self.scope[name] = 0
+                else:
+                    self.scope[name] = 0.0
+            self.execute(arena.c[index])
+        elif kind == PROGRAM_NODE:
+            self.execute(arena.b[index])
+
+    def evaluate(self, index):
+        arena = self.arena
+        kind = arena.kinds[index]
+        if kind == VAR_NODE:
+            return self.scope[arena.constants[arena.a[index]]]
+        if kind == NUM_NODE:
+            return arena.constants[arena.a[index]]
+        if kind == BIN_OP_NODE:
+            return self.binary[arena.c[index]](self.evaluate(arena.a[index]), self.evaluate(arena.b[index]))
+        return self.unary[arena.c[index]](self.evaluate(arena.a[index]))
+
+    def interpret(self):
+        self.execute(self.arena.root)
+
+
+def evaluate_arena(text):
+    interpreter = ArenaInterpreter(parse_arena(text))
+    interpreter.interpret()
+    return interpreter.scope
+
+
+def evaluate_file(path):
+    with open(path, 'rb') as file:
+        interpreter = Interpreter(Parser(StreamLexer(file)))
+        interpreter.interpret()
+    return interpreter.scope
+
+
+def main():
+    import sys
+    print(evaluate_file(sys.argv[1]))
+
+
+if __name__ == '__main__':
+    main()
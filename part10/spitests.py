@@ -1,6 +1,10 @@
+import io
+import tracemalloc
+import mmap
+import tempfile
 import unittest
 
-from spi import lex, evaluate, Lexer, Num, parse, VarDecl, Assign, Var, Type, Token, Program, Compound, Block, INTEGER_CONST, PLUS, MINUS, PROGRAM, LPAREN, REAL_CONST, RPAREN, ID, SEMI, VAR, COLON, INTEGER, COMMA, REAL, BEGIN, ASSIGN, MUL, END, FLOAT_DIV, DOT, INTEGER_DIV
+from spi import lex, compile_text, CompiledProgram, RunState, Limits, LimitedInterpreter, LimitExceeded, NodeLimitExceeded, DeadlineExceeded, IntegerTooLarge, TooManyVariables, resolve, SlotInterpreter, evaluate_resolved, ConstDecl, CONST, EQUAL, NodeVisitor, Interpreter, parse_arena, evaluate_arena, BinOp, UnaryOp, StreamLexer, evaluate_file, fast_lex, lex_buffer, FIXED_TOKENS, TokenBuffer, evaluate, Lexer, RegexLexer, Parser, Num, parse, VarDecl, Assign, Var, Type, Token, Program, Compound, Block, INTEGER_CONST, PLUS, MINUS, PROGRAM, LPAREN, REAL_CONST, RPAREN, ID, SEMI, VAR, COLON, INTEGER, COMMA, REAL, BEGIN, ASSIGN, MUL, END, FLOAT_DIV, DOT, INTEGER_DIV, EOF
 
 sample_program = open("part10.pas", "r").read()
 
@@ -93,6 +97,117 @@ class TestSuite(unittest.TestCase):
         ]
         self.assertEqual(tokens, expected)
 
+    def test_fast_lex_program(self):
+        self.assertEqual(fast_lex(sample_program), lex(sample_program))
+
+    def test_fast_lex_edge_cases(self):
+        text = "a1:b:=c{x}{y}  1.+2.50 dIv Begin{z}end. "
+        self.assertEqual(fast_lex(text), lex(text))
+        self.assertEqual(fast_lex(''), [])
+        self.assertEqual(fast_lex('  {only a comment}  '), [])
+
+    def test_fast_lex_errors(self):
+        with self.assertRaises(Exception):
+            fast_lex('a := 1 $ 2')
+        with self.assertRaises(Exception):
+            fast_lex('a := 1 {unterminated')
+
+    def test_regex_lexer_parse(self):
+        ast = Parser(RegexLexer(sample_program)).parse()
+        self.assertEqual(ast, parse(sample_program))
+
+    def test_token_slots(self):
+        token = Token(ID, 'a')
+        with self.assertRaises(AttributeError):
+            token.__dict__
+
+    def test_fast_lex_shares_tokens(self):
+        tokens = fast_lex('a := a + 1; b := a + 1')
+        self.assertIs(tokens[3], FIXED_TOKENS['+'])
+        self.assertIs(tokens[3], tokens[9])
+        self.assertIs(tokens[0], tokens[8])
+        self.assertIs(tokens[4], tokens[10])
+
+    def test_lex_buffer_program(self):
+        buffer = lex_buffer(sample_program)
+        self.assertEqual(len(buffer), len(lex(sample_program)))
+        self.assertEqual(list(buffer), lex(sample_program))
+        self.assertIs(buffer[2], FIXED_TOKENS[';'])
+
+    def test_lex_buffer_offsets(self):
+        text = "a:= {c} 12.5*b"
+        buffer = lex_buffer(text)
+        self.assertEqual(list(buffer.offsets), [0, 1, 8, 12, 13])
+        self.assertEqual(list(buffer.values), ['a', ':=', 12.5, '*', 'b'])
+
+    def test_lex_buffer_parse(self):
+        ast = Parser(lex_buffer(sample_program)).parse()
+        self.assertEqual(ast, parse(sample_program))
+
+    def test_empty_token_buffer(self):
+        buffer = TokenBuffer()
+        self.assertEqual(buffer.get_next_token(), Token(EOF, ''))
+
+    def stream_lex(self, source, chunk_size):
+        lexer = StreamLexer(source, chunk_size)
+        tokens = []
+        token = lexer.get_next_token()
+        while token.type != EOF:
+            tokens.append(token)
+            token = lexer.get_next_token()
+        return tokens
+
+    def test_stream_lexer_chunk_boundaries(self):
+        expected = lex(sample_program)
+        for chunk_size in [1, 2, 3, 5, 8, 13, 1 << 16]:
+            self.assertEqual(self.stream_lex(sample_program, chunk_size), expected)
+            self.assertEqual(self.stream_lex(sample_program.encode(), chunk_size), expected)
+
+    def test_stream_lexer_sources(self):
+        expected = lex(sample_program)
+        data = sample_program.encode()
+        self.assertEqual(self.stream_lex(io.StringIO(sample_program), 7), expected)
+        self.assertEqual(self.stream_lex(io.BytesIO(data), 7), expected)
+        self.assertEqual(self.stream_lex(memoryview(data), 7), expected)
+        with tempfile.TemporaryFile() as file:
+            file.write(data)
+            file.flush()
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                self.assertEqual(self.stream_lex(mapped, 7), expected)
+
+    def test_stream_lexer_split_utf8(self):
+        tokens = self.stream_lex('caf\u00e9 := 1'.encode(), 1)
+        self.assertEqual(tokens[0], Token(ID, 'caf\u00e9'))
+
+    def test_stream_lexer_bounded_buffer(self):
+        text = 'a {' + 'x' * 100000 + '}' + ' ' * 100000 + ':= {' + '{' * 10 + '} b'
+        lexer = StreamLexer(text, 64)
+        tokens = []
+        token = lexer.get_next_token()
+        while token.type != EOF:
+            self.assertLessEqual(len(lexer.buffer), 128)
+            tokens.append(token)
+            token = lexer.get_next_token()
+        self.assertEqual(tokens, lex(text))
+
+    def test_stream_lexer_unterminated_comment(self):
+        with self.assertRaises(Exception):
+            self.stream_lex('a {' + 'x' * 1000, 16)
+
+    def test_evaluate_file(self):
+        self.assertEqual(evaluate_file('part10.pas'), evaluate(sample_program))
+
+    def test_lexer_consecutive_comments(self):
+        text = '{generated}' * 1000000 + ' x := 1 ' + '{}' * 1000000
+        expected = [Token(ID, 'x'), Token(ASSIGN, ':='), Token(INTEGER_CONST, 1)]
+        self.assertEqual(lex(text), expected)
+        self.assertEqual(fast_lex(text), expected)
+        self.assertEqual(self.stream_lex(text, 1 << 16), expected)
+
+    def test_lexer_unterminated_comment(self):
+        with self.assertRaises(Exception):
+            lex('x := 1 {never closed')
+
     def test_parser_simple(self):
         program = """
 PROGRAM onevar;
@@ -120,10 +235,110 @@ END.
         )
         self.assertEqual(ast, expected)
 
+    def test_parser_precedence(self):
+        ast = parse('PROGRAM p; BEGIN x := a - b - c * -d DIV (e + f) / g END.')
+        def var(name):
+            return Var(Token(ID, name))
+        expected = BinOp(
+            BinOp(var('a'), Token(MINUS, '-'), var('b')),
+            Token(MINUS, '-'),
+            BinOp(
+                BinOp(
+                    BinOp(var('c'), Token(MUL, '*'),
+                          UnaryOp(Token(MINUS, '-'), var('d'))),
+                    Token(INTEGER_DIV, 'DIV'),
+                    BinOp(var('e'), Token(PLUS, '+'), var('f'))),
+                Token(FLOAT_DIV, '/'),
+                var('g')))
+        self.assertEqual(ast.block.compound_statement.children[0].right, expected)
+
+    def test_parser_unary_binds_tighter(self):
+        ast = parse('PROGRAM p; BEGIN x := - 2 * + 3 END.')
+        expected = BinOp(
+            UnaryOp(Token(MINUS, '-'), Num(Token(INTEGER_CONST, 2))),
+            Token(MUL, '*'),
+            UnaryOp(Token(PLUS, '+'), Num(Token(INTEGER_CONST, 3))))
+        self.assertEqual(ast.block.compound_statement.children[0].right, expected)
+
+    def test_iterative_parser_matches_parser(self):
+        programs = [
+            sample_program,
+            'PROGRAM p; BEGIN x := a - b - c * -d DIV (e + f) / g END.',
+            'PROGRAM p; BEGIN x := -(-(a)) * ((b)) + - + - 1.5; ; BEGIN END; BEGIN BEGIN y := 2 END; END END.'
+        ]
+        for program in programs:
+            self.assertEqual(parse(program, iterative=True), parse(program))
+
+    def test_iterative_parser_errors(self):
+        for program in ['PROGRAM p; BEGIN x := (1 END.', 'PROGRAM p; BEGIN x := 1 + END.',
+                        'PROGRAM p; BEGIN BEGIN x := 1 END.']:
+            with self.assertRaises(Exception):
+                parse(program, iterative=True)
+
+    def test_iterative_parser_deep_parentheses(self):
+        depth = 100000
+        ast = parse('PROGRAM p; BEGIN x := ' + '(' * depth + '1' + ')' * depth + ' END.', iterative=True)
+        self.assertEqual(ast.block.compound_statement.children[0].right, Num(Token(INTEGER_CONST, 1)))
+
+    def test_iterative_parser_deep_unary_chain(self):
+        depth = 100000
+        ast = parse('PROGRAM p; BEGIN x := a' + ' -' * depth + ' b END.', iterative=True)
+        node = ast.block.compound_statement.children[0].right
+        self.assertEqual(node.left, Var(Token(ID, 'a')))
+        node = node.right
+        for _ in range(depth - 1):
+            self.assertEqual(node.op, Token(MINUS, '-'))
+            node = node.expr
+        self.assertEqual(node, Var(Token(ID, 'b')))
+
+    def test_iterative_parser_deep_compound(self):
+        depth = 100000
+        ast = parse('PROGRAM p; ' + 'BEGIN ' * depth + 'x := 1' + ' END' * depth + '.', iterative=True)
+        node = ast.block.compound_statement
+        for _ in range(depth - 1):
+            self.assertEqual(len(node.children), 1)
+            node = node.children[0]
+        self.assertEqual(node.children[0].right, Num(Token(INTEGER_CONST, 1)))
+
     def test_parser_program(self):
         ast = parse(sample_program)
         self.assertNotEqual(ast, None)  # just want to make sure it runs
 
+    def test_ast_slots(self):
+        ast = parse(sample_program)
+        for node in [ast, ast.block, ast.block.declarations[0], ast.block.compound_statement]:
+            with self.assertRaises(AttributeError):
+                node.__dict__
+        assign = ast.block.compound_statement.children[1]
+        self.assertIs(assign.op, assign.token)
+        self.assertEqual(assign.left.value, 'x')
+
+    def test_arena_matches_ast(self):
+        arena = parse_arena(sample_program)
+        self.assertEqual(arena.to_ast(), parse(sample_program))
+        self.assertEqual(parse_arena(sample_program, iterative=True).to_ast(), parse(sample_program))
+
+    def test_arena_constants_pooled(self):
+        arena = parse_arena('PROGRAM p; BEGIN x := 1 + 1.0 + 1; y := x END.')
+        self.assertEqual(arena.constants, ['x', 1, 1.0, 'y', 'p'])
+        self.assertIsInstance(arena.constants[2], float)
+
+    def test_arena_memory(self):
+        statements = ['x := {0} * a + b - (c DIV {1}) * -y'.format(i, i + 1) for i in range(5000)]
+        program = 'PROGRAM p; VAR a, b, c, x : INTEGER; y : REAL; BEGIN ' + '; '.join(statements) + ' END.'
+        tracemalloc.start()
+        try:
+            ast = parse(program)
+            tree_size = tracemalloc.get_traced_memory()[0]
+            del ast
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            arena = parse_arena(program)
+            arena_size = tracemalloc.get_traced_memory()[0] - start
+        finally:
+            tracemalloc.stop()
+        self.assertLess(arena_size * 3, tree_size)
+
     def test_interpret_simple(self):
         program = """
 PROGRAM onevar;
@@ -139,6 +354,38 @@ END.
         expected = {'x': 3}
         self.assertEqual(scope, expected)
 
+    def test_evaluate_arena(self):
+        self.assertEqual(evaluate_arena(sample_program), evaluate(sample_program))
+
+    def test_node_visitor_dispatch_cache(self):
+        class Counter(NodeVisitor):
+            def visit_Num(self, node):
+                return node.value
+
+        counter = Counter()
+        self.assertEqual(counter.visit(Num(Token(INTEGER_CONST, 4))), 4)
+        self.assertIn(Num, Counter.visitors)
+        self.assertIsNot(Counter.visitors, Interpreter.visitors)
+        self.assertEqual(NodeVisitor.visitors, {})
+        with self.assertRaises(Exception):
+            counter.visit(Var(Token(ID, 'x')))
+        self.assertIs(Counter.visitors[Var], NodeVisitor.generic_visit)
+
+    def test_const_section(self):
+        program = "PROGRAM p; CONST ten = 10; Half = ten / 4; VAR x : INTEGER; BEGIN x := ten * 2 END."
+        tokens = lex(program)
+        self.assertEqual(tokens[3:6], [Token(CONST, 'CONST'), Token(ID, 'ten'), Token(EQUAL, '=')])
+        self.assertEqual(fast_lex(program), tokens)
+        ast = parse(program)
+        self.assertEqual(ast.block.declarations[0],
+                         ConstDecl(Var(Token(ID, 'ten')), Num(Token(INTEGER_CONST, 10))))
+        self.assertEqual(evaluate(program), {'ten': 10, 'Half': 2.5, 'x': 20})
+        self.assertEqual(evaluate_arena(program), evaluate(program))
+
+    def test_assign_to_const(self):
+        with self.assertRaises(Exception):
+            parse('PROGRAM p; CONST k = 1; BEGIN k := 2 END.')
+
     def test_interpret_program(self):
         scope = evaluate(sample_program)
         number = 2
@@ -157,6 +404,138 @@ END.
         }
         self.assertEqual(scope, expected)
 
+    def test_slot_resolution(self):
+        self.assertEqual(evaluate_resolved(sample_program), evaluate(sample_program))
+        program = parse('PROGRAM p; VAR Total : INTEGER; BEGIN Total := 3; x := Total * 2; x := x + 1 END.')
+        resolver = resolve(program)
+        self.assertEqual(resolver.names, ['Total', 'x'])
+        statements = program.block.compound_statement.children
+        self.assertEqual([statements[0].left.slot, statements[1].right.left.slot, statements[2].left.slot], [0, 0, 1])
+        interpreter = SlotInterpreter(None, resolver)
+        interpreter.visit(program)
+        self.assertEqual(interpreter.scope, {'Total': 3, 'x': 7})
+        # running again starts from the declared values, not the last run's
+        interpreter.visit(program)
+        self.assertEqual(interpreter.scope, {'Total': 3, 'x': 7})
+
+    def test_slot_names_keep_their_case(self):
+        # like the Interpreter's scope, slots are keyed by exact spelling
+        for text in ['PROGRAM p; BEGIN x := 1; X := 2 END.',
+                     'PROGRAM p; VAR a : REAL; A : INTEGER; BEGIN b := a; B := A END.']:
+            self.assertEqual(evaluate_resolved(text), evaluate(text))
+        with self.assertRaises(KeyError):
+            evaluate_resolved('PROGRAM p; BEGIN x := 1; y := X END.')
+
+    def test_slot_interpreter_errors(self):
+        with self.assertRaises(KeyError):
+            evaluate_resolved('PROGRAM p; BEGIN x := y END.')
+        self.assertEqual(evaluate_resolved('PROGRAM p; CONST k = 2; VAR r : REAL; BEGIN r := k / 4 END.'),
+                         {'k': 2, 'r': 0.5})
+        # x is not declared yet when k is evaluated
+        text = 'PROGRAM p; CONST k = x + 1; VAR x : INTEGER; BEGIN END.'
+        with self.assertRaises(KeyError):
+            evaluate(text)
+        with self.assertRaises(KeyError):
+            evaluate_resolved(text)
+        with self.assertRaises(KeyError):
+            compile_text(text).run()
+
+    def test_limits(self):
+        generous = Limits(max_nodes=1000, timeout=60, max_int_bits=64, max_variables=10)
+        self.assertEqual(evaluate(sample_program, generous), evaluate(sample_program))
+        cases = [
+            (Limits(max_nodes=20), NodeLimitExceeded),
+            (Limits(max_int_bits=4), IntegerTooLarge),
+            (Limits(max_variables=5), TooManyVariables),
+        ]
+        for limits, exception in cases:
+            with self.assertRaises(exception):
+                evaluate(sample_program, limits)
+        squaring = 'PROGRAM p; BEGIN x := 3; ' + '; '.join(['x := x * x'] * 40) + ' END.'
+        with self.assertRaises(IntegerTooLarge) as context:
+            evaluate(squaring, Limits(max_int_bits=1024))
+        self.assertIsInstance(context.exception, LimitExceeded)
+        self.assertEqual(str(context.exception), 'Value computed for x is wider than 1024 bits')
+        with self.assertRaises(TooManyVariables):
+            evaluate('PROGRAM p; CONST a = 1; b = 2; BEGIN END.', Limits(max_variables=1))
+
+    def test_int_bits_checked_inside_statements(self):
+        # 2 ** 32 is within the limit, but the product is not, and each
+        # further multiplication would only get slower
+        product = ' * '.join(['4294967296'] * 200)
+        interpreter = LimitedInterpreter(None, Limits(max_int_bits=64, timeout=60))
+        with self.assertRaises(IntegerTooLarge) as context:
+            interpreter.visit(parse('PROGRAM p; BEGIN y := ' + product + ' END.'))
+        self.assertEqual(str(context.exception), 'Value computed for y is wider than 64 bits')
+        # the left spine of the product is walked down first, but only the
+        # first few of its 200 right operands are reached
+        self.assertLess(interpreter.nodes, 210)
+        with self.assertRaises(IntegerTooLarge):
+            evaluate('PROGRAM p; CONST k = 36893488147419103232; BEGIN END.', Limits(max_int_bits=64))
+
+    def test_node_count(self):
+        interpreter = LimitedInterpreter(None, Limits())
+        interpreter.visit(parse('PROGRAM p; BEGIN x := 1 + 2 * 3; END.'))
+        # Program, Block, Compound, Assign, 1, +, 2, *, 3 and the empty statement
+        self.assertEqual(interpreter.nodes, 10)
+
+    def test_deadline(self):
+        text = 'PROGRAM p; VAR i : INTEGER; BEGIN ' + '; '.join(['i := i + 1'] * 100000) + ' END.'
+        with self.assertRaises(DeadlineExceeded):
+            evaluate(text, Limits(timeout=0))
+
+    def test_compiled_program(self):
+        compiled = compile_text(sample_program)
+        self.assertEqual(compiled.run(), evaluate(sample_program))
+        with self.assertRaises(AttributeError):
+            compiled.names = ()
+        state = RunState(compiled)
+        state.run()
+        state.values[0] = 100
+        # a run's state never leaks into the program or the next run
+        self.assertEqual(compiled.run(), evaluate(sample_program))
+
+    def test_compiled_program_names_keep_their_case(self):
+        for text in ['PROGRAM p; BEGIN x := 1; X := 2 END.',
+                     'PROGRAM p; VAR a : REAL; A : INTEGER; BEGIN b := a + A; B := A * 2; a := B END.']:
+            compiled = compile_text(text)
+            self.assertEqual(compiled.run(), evaluate(text))
+            self.assertEqual(compiled.run(), evaluate(text))
+
+    def test_compiled_programs_sharing_nodes(self):
+        from optimizer import optimize
+        tree = parse('PROGRAM p; BEGIN a := 3; b := 2; c := a END.')
+        first = CompiledProgram(tree)
+        CompiledProgram(optimize(tree, outputs=['c']))
+        self.assertEqual(first.run(), {'a': 3, 'b': 2, 'c': 3})
+        self.assertEqual([child.left.slot for child in tree.block.compound_statement.children], [-1, -1, -1])
+
+    def test_compiled_program_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+        text = 'PROGRAM p; VAR i : INTEGER; BEGIN ' + '; '.join(['i := i + 1'] * 2000) + ' END.'
+        compiled = CompiledProgram(parse(text))
+        with ThreadPoolExecutor(8) as executor:
+            scopes = list(executor.map(lambda _: compiled.run(), range(32)))
+        self.assertEqual(scopes, [{'i': 2000}] * 32)
+
+    def test_evaluate_wanted_variables(self):
+        full = evaluate(sample_program)
+        self.assertEqual(evaluate(sample_program, want=['c', 'y']), {'c': full['c'], 'y': full['y']})
+        self.assertEqual(evaluate(sample_program, want=['missing']), {})
+        # x is not needed, but the division might raise, so it still runs
+        with self.assertRaises(ZeroDivisionError):
+            evaluate('PROGRAM p; VAR z : INTEGER; BEGIN x := 1 DIV z; y := 2 END.', want=['y'])
+        with self.assertRaises(KeyError):
+            evaluate('PROGRAM p; BEGIN x := w; y := 2 END.', want=['y'])
+        text = 'PROGRAM p; BEGIN x := 3; ' + '; '.join(['x := x * x'] * 20) + '; y := 2 END.'
+        self.assertEqual(evaluate(text, want=['y']), {'y': 2})
+        with self.assertRaises(IntegerTooLarge):
+            evaluate(text, Limits(max_int_bits=64), want=['y'])
+        # x / 2 overflows converting x to float, so z alone still fails
+        text = 'PROGRAM p; BEGIN x := 3; ' + '; '.join(['x := x * x'] * 12) + '; y := x / 2; z := 1 END.'
+        with self.assertRaises(OverflowError):
+            evaluate(text, want=['z'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,136 @@
+'''
+Semantic analysis for part10 programs: builds a symbol table from the
+declarations, rejects undeclared variables and type errors before anything
+runs, and records the static type of every expression on its node.
+
+The rules are Pascal's: INTEGER widens to REAL but not the other way
+around, `/` always gives a REAL, and DIV takes INTEGER operands only.
+evaluate_checked() runs checked programs on the closure compiler, which
+reads the annotations to store INTEGER values assigned to REAL variables
+as floats, so a REAL variable always holds a float. Arithmetic itself is
+not specialized by type: Python's operators already dispatch on it.
+'''
+
+from closurecompiler import compile_program
+from spi import NodeVisitor, INTEGER, REAL, INTEGER_CONST, INTEGER_DIV, FLOAT_DIV, parse
+
+
+class SemanticError(Exception):
+    pass
+
+
+class Symbol(object):
+    def __init__(self, name, type, constant=False):
+        self.name = name
+        # INTEGER or REAL
+        self.type = type
+        self.constant = constant
+
+    def __repr__(self):
+        return 'Symbol(' + self.name + ', ' + self.type + ')'
+
+
+class SymbolTable(object):
+    def __init__(self):
+        self.symbols = {}
+
+    def define(self, symbol):
+        if symbol.name in self.symbols:
+            raise SemanticError('Duplicate declaration of ' + symbol.name)
+        self.symbols[symbol.name] = symbol
+
+    def lookup(self, name):
+        symbol = self.symbols.get(name)
+        if symbol is None:
+            raise SemanticError('Undeclared variable ' + name)
+        return symbol
+
+    def __contains__(self, name):
+        return name in self.symbols
+
+    def __iter__(self):
+        return iter(self.symbols.values())
+
+
+class TypeChecker(NodeVisitor):
+    def __init__(self):
+        self.symbols = SymbolTable()
+
+    def visit_Program(self, program):
+        self.visit(program.block)
+        return self.symbols
+
+    def visit_Block(self, block):
+        for decl in block.declarations:
+            self.visit(decl)
+        self.visit(block.compound_statement)
+
+    def visit_VarDecl(self, var_decl):
+        self.symbols.define(Symbol(var_decl.var_node.value, var_decl.type_node.token.type))
+
+    def visit_ConstDecl(self, const_decl):
+        type = self.visit(const_decl.value)
+        self.symbols.define(Symbol(const_decl.var_node.value, type, constant=True))
+        const_decl.var_node.static_type = type
+
+    def visit_Compound(self, compound):
+        for child in compound.children:
+            self.visit(child)
+
+    def visit_NoOp(self, no_op):
+        pass
+
+    def visit_Assign(self, assign):
+        type = self.visit(assign.right)
+        name = assign.left.value
+        symbol = self.symbols.lookup(name)
+        if symbol.constant:
+            raise SemanticError('Cannot assign to constant ' + name)
+        if symbol.type == INTEGER and type == REAL:
+            raise SemanticError('Cannot assign a REAL value to INTEGER variable ' + name)
+        assign.left.static_type = symbol.type
+        assign.static_type = symbol.type
+
+    def visit_Var(self, var):
+        var.static_type = self.symbols.lookup(var.value).type
+        return var.static_type
+
+    def visit_Num(self, num):
+        if num.token.type == INTEGER_CONST:
+            num.static_type = INTEGER
+        else:
+            num.static_type = REAL
+        return num.static_type
+
+    def visit_BinOp(self, bin_op):
+        left = self.visit(bin_op.left)
+        right = self.visit(bin_op.right)
+        op = bin_op.op.type
+        if op == INTEGER_DIV:
+            if left != INTEGER or right != INTEGER:
+                raise SemanticError('DIV needs INTEGER operands, got ' + left + ' DIV ' + right)
+            type = INTEGER
+        elif op == FLOAT_DIV or left == REAL or right == REAL:
+            type = REAL
+        else:
+            type = INTEGER
+        bin_op.static_type = type
+        return type
+
+    def visit_UnaryOp(self, unary_op):
+        unary_op.static_type = self.visit(unary_op.expr)
+        return unary_op.static_type
+
+
+def check(program):
+    '''
+    Type checks a program in place, annotating its expression nodes, and
+    returns the symbol table. Raises SemanticError on the first error.
+    '''
+    return TypeChecker().visit(program)
+
+
+def evaluate_checked(text):
+    program = parse(text)
+    check(program)
+    return compile_program(program)()
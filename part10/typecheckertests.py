@@ -0,0 +1,59 @@
+import unittest
+
+from spi import evaluate, parse, INTEGER, REAL
+from typechecker import check, evaluate_checked, SemanticError
+
+sample_program = open("part10.pas", "r").read()
+
+
+class TestSuite(unittest.TestCase):
+    def test_program(self):
+        self.assertEqual(evaluate_checked(sample_program), evaluate(sample_program))
+        symbols = check(parse(sample_program))
+        self.assertEqual(dict((symbol.name, symbol.type) for symbol in symbols), {
+            'number': INTEGER, 'a': INTEGER, 'b': INTEGER, 'c': INTEGER, 'x': INTEGER, 'y': REAL
+        })
+
+    def test_annotations(self):
+        program = parse('PROGRAM p; CONST k = 2.5; VAR i : INTEGER; r : REAL; BEGIN r := i * 2 + k; i := i DIV 2; r := - i / 2 END.')
+        check(program)
+        self.assertEqual(program.block.declarations[0].var_node.static_type, REAL)
+        first, second, third = program.block.compound_statement.children
+        self.assertEqual(first.right.static_type, REAL)
+        self.assertEqual(first.right.left.static_type, INTEGER)
+        self.assertEqual(second.right.static_type, INTEGER)
+        self.assertEqual(third.right.static_type, REAL)
+        self.assertEqual(third.right.left.static_type, INTEGER)
+        self.assertEqual(third.left.static_type, REAL)
+        self.assertEqual(first.static_type, REAL)
+        self.assertEqual(second.static_type, INTEGER)
+
+    def test_widening(self):
+        scope = evaluate_checked('PROGRAM p; VAR i : INTEGER; r, s : REAL; BEGIN i := 3; r := i * 2; s := 7 END.')
+        self.assertEqual(scope, {'i': 3, 'r': 6.0, 's': 7.0})
+        self.assertIs(type(scope['r']), float)
+        self.assertIs(type(scope['s']), float)
+        self.assertIs(type(scope['i']), int)
+
+    def test_errors(self):
+        errors = {
+            'PROGRAM p; BEGIN x := 1 END.': 'Undeclared variable x',
+            'PROGRAM p; VAR x : INTEGER; BEGIN x := y END.': 'Undeclared variable y',
+            'PROGRAM p; VAR x : INTEGER; BEGIN x := 1.5 END.': 'Cannot assign a REAL value to INTEGER variable x',
+            'PROGRAM p; VAR x : INTEGER; BEGIN x := 4 / 2 END.': 'Cannot assign a REAL value to INTEGER variable x',
+            'PROGRAM p; VAR r : REAL; BEGIN r := r DIV 2 END.': 'DIV needs INTEGER operands, got REAL DIV INTEGER',
+            'PROGRAM p; VAR x : INTEGER; x : REAL; BEGIN END.': 'Duplicate declaration of x',
+        }
+        for text, message in errors.items():
+            with self.assertRaises(SemanticError) as context:
+                check(parse(text))
+            self.assertEqual(str(context.exception), message)
+
+    def test_errors_before_execution(self):
+        # the division by zero would raise first if anything ran
+        with self.assertRaises(SemanticError):
+            evaluate_checked('PROGRAM p; VAR x : INTEGER; BEGIN x := 1 DIV 0; x := y END.')
+
+
+if __name__ == '__main__':
+    unittest.main()